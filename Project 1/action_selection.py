@@ -0,0 +1,114 @@
+"""
+action_selection.py
+
+Epsilon-greedy action selection over a QTable.
+
+Distribution (|A| actions, k of them tied for the best Q-value):
+    each greedy action → (1 - epsilon) / k + epsilon / |A|
+    every other action → epsilon / |A|
+
+With k = 1 the greedy action gets 1 - epsilon + epsilon/|A|,
+exactly as in the textbook definition.
+
+Both samplers use a single uniform draw u per decision:
+    u < epsilon  → explore:  action = floor(u / epsilon * |A|)
+    otherwise    → exploit:  v = (u - epsilon) / (1 - epsilon)
+                             picks tied greedy action floor(v * k)
+
+No probability vector is built and Q is not read at all
+when the agent explores.
+"""
+
+import random
+
+import numpy as np
+
+
+# ============================================================
+# 1. Single State
+# ============================================================
+
+def epsilon_greedy(Q, state, epsilon, rng=random):
+    """
+    Select one action for one state.
+
+    Inputs:
+        Q       → QTable
+        state   → integer state index
+        epsilon → exploration probability
+        rng     → object with a random() method
+                  (random module or random.Random instance)
+
+    Returns:
+        action (integer id into ACTIONS)
+    """
+
+    u = rng.random()
+
+    # Explore: u / epsilon is itself uniform on [0, 1)
+    if u < epsilon:
+        return int(u / epsilon * Q.n_actions)
+
+    # Exploit: read the row once as plain floats
+    q_values = Q.read_row(state).tolist()
+    max_q = max(q_values)
+    n_ties = q_values.count(max_q)
+
+    if n_ties == 1:
+        return q_values.index(max_q)
+
+    # Reuse the draw to pick the j-th tied action (clamped: for u
+    # just below 1 the scaled draw can round up to n_ties)
+    j = min(int((u - epsilon) / (1 - epsilon) * n_ties), n_ties - 1)
+
+    for action, value in enumerate(q_values):
+        if value == max_q:
+            if j == 0:
+                return action
+            j -= 1
+
+
+# ============================================================
+# 2. Batch of States
+# ============================================================
+
+def epsilon_greedy_batch(Q, states, epsilon, rng):
+    """
+    Select one action per state for a whole batch.
+
+    Inputs:
+        Q       → QTable
+        states  → integer array of state indices
+        epsilon → exploration probability
+        rng     → numpy.random.Generator
+
+    Returns:
+        integer array of action ids
+    """
+
+    q_values = Q.rows(states)
+    n, num_actions = q_values.shape
+
+    u = rng.random(n)
+    explore = u < epsilon
+
+    # Mark every greedy (maximal) action of each row
+    is_max = q_values == q_values.max(axis=1, keepdims=True)
+    n_ties = is_max.sum(axis=1)
+
+    # Rescale u to [0, 1) within the exploit region
+    # (only used where explore is False, so 1 - epsilon > 0 there)
+    v = (u - epsilon) / max(1.0 - epsilon, np.finfo(float).tiny)
+    k = np.minimum((v * n_ties).astype(np.int64), n_ties - 1)
+
+    # Index of the k-th True entry of each row
+    greedy = (np.cumsum(is_max, axis=1) > k[:, None]).argmax(axis=1)
+
+    if epsilon <= 0:
+        return greedy
+
+    random_actions = np.minimum(
+        (u / epsilon * num_actions).astype(np.int64), num_actions - 1
+    )
+
+    return np.where(explore, random_actions, greedy)
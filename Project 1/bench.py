@@ -0,0 +1,416 @@
+"""
+bench.py
+
+Reproducible performance benchmarks.
+
+1. Microbenchmarks (10x10 default map, fixed random inputs):
+   - FrozenLakeEnv.step (by action name) and step_index
+   - epsilon_greedy and epsilon_greedy_batch
+   - the inner Q update of SARSA, Q-learning and Monte Carlo,
+     and the batched QTable.td_update
+   Each is run `repeat` times; the best run is reported.
+
+2. End-to-end training of every learner on several maps:
+   4x4, the 10x10 default and larger generated maps.
+   Reported: episodes/s, env steps/s (for the TD learners every
+   step is one Q update, so this is also updates/s) and the peak
+   memory traced by tracemalloc in a separate run.
+   Batched learners also step episodes that are still running when
+   training stops; only steps of recorded episodes are counted.
+
+Results are written as JSON together with the machine's details,
+so runs from different commits can be compared:
+
+    python bench.py --out bench.json
+    python bench.py --quick            (smaller, for a fast check)
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from config import ACTIONS, DEFAULT_CONFIG
+from env import FrozenLakeEnv
+from action_selection import epsilon_greedy, epsilon_greedy_batch
+from mc_control import monte_carlo_control, discounted_returns
+from sarsa import sarsa, sarsa_batched
+from q_learning import q_learning, q_learning_batched
+from dyna_q import dyna_q
+from prioritized_sweeping import prioritized_sweeping
+from qtable import QTable
+
+# Algorithm name → training function
+LEARNERS = {
+    "Monte Carlo": monte_carlo_control,
+    "SARSA": sarsa,
+    "Q-Learning": q_learning,
+    "SARSA (batched)": sarsa_batched,
+    "Q-Learning (batched)": q_learning_batched,
+    "Dyna-Q": dyna_q,
+    "Prioritized Sweeping": prioritized_sweeping,
+}
+
+
+# ============================================================
+# 1. Machine and Maps
+# ============================================================
+
+def machine_info():
+    """
+    Details of the machine and software the benchmark ran on.
+    """
+
+    info = {
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+    # Commit being benchmarked (if run inside the git checkout)
+    try:
+        info["commit"] = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        info["commit"] = None
+
+    return info
+
+
+def bench_map(size, hole_density=0.15, seed=0):
+    """
+    Config of a generated, solvable size x size map
+    (see env.generate_map).
+    """
+
+    return DEFAULT_CONFIG.replace(
+        grid_rows=size,
+        grid_cols=size,
+        start_state=(0, 0),
+        goal_state=(size - 1, size - 1),
+        hole_density=hole_density,
+        map_seed=seed,
+    )
+
+
+def default_maps():
+    """
+    Maps used by the end-to-end benchmark, by name.
+    """
+
+    return {
+        "4x4": DEFAULT_CONFIG.replace(
+            grid_rows=4, grid_cols=4, goal_state=(3, 3),
+            holes=((1, 1), (1, 3), (2, 3), (3, 0)),
+        ),
+        "10x10": DEFAULT_CONFIG,
+        "25x25": bench_map(25),
+        "50x50": bench_map(50),
+    }
+
+
+# ============================================================
+# 2. Microbenchmarks
+# ============================================================
+
+def _best_time(fn, repeat):
+    """
+    Shortest wall time of `repeat` calls of fn().
+    """
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _rate(ops, seconds):
+    return {
+        "ops": ops,
+        "seconds": seconds,
+        "ops_per_sec": ops / seconds,
+        "ns_per_op": seconds / ops * 1e9,
+    }
+
+
+def micro_benchmarks(n=100000, repeat=5, seed=0):
+    """
+    Time the hot operations on the default 10x10 map.
+
+    Inputs:
+        n      → operations per timed run
+        repeat → timed runs (the best is kept)
+
+    Returns:
+        {name: {"ops", "seconds", "ops_per_sec", "ns_per_op"}}
+    """
+
+    env = FrozenLakeEnv(DEFAULT_CONFIG)
+    config = env.config
+    alpha, discount = config.alpha, config.discount
+
+    rng = np.random.default_rng(seed)
+    Q = QTable.from_values(rng.standard_normal((env.n_states, env.n_actions)))
+
+    states = rng.integers(env.n_states, size=n).tolist()
+    next_states = rng.integers(env.n_states, size=n).tolist()
+    actions = rng.integers(env.n_actions, size=n).tolist()
+    rewards = rng.integers(-1, 2, size=n).tolist()
+    names = [ACTIONS[a] for a in actions]
+
+    results = {}
+
+    # --------------------------------------------------
+    # Environment
+    # --------------------------------------------------
+    def env_step():
+        env.reset()
+        for name in names:
+            if env.step(name)[2]:
+                env.reset()
+
+    def env_step_index():
+        step_index = env.step_index
+        for s, a in zip(states, actions):
+            step_index(s, a)
+
+    env.step_index(0, 0)  # build the lookup table outside the timing
+    results["env.step"] = _rate(n, _best_time(env_step, repeat))
+    results["env.step_index"] = _rate(n, _best_time(env_step_index, repeat))
+
+    # --------------------------------------------------
+    # Action selection
+    # --------------------------------------------------
+    def select():
+        py_rng = random.Random(seed)
+        for s in states:
+            epsilon_greedy(Q, s, 0.1, py_rng)
+
+    batch = np.asarray(states[:1024])
+    n_batches = max(n // len(batch), 1)
+
+    def select_batch():
+        np_rng = np.random.default_rng(seed)
+        for _ in range(n_batches):
+            epsilon_greedy_batch(Q, batch, 0.1, np_rng)
+
+    results["epsilon_greedy"] = _rate(n, _best_time(select, repeat))
+    results["epsilon_greedy_batch"] = _rate(
+        n_batches * len(batch), _best_time(select_batch, repeat)
+    )
+
+    # --------------------------------------------------
+    # Q updates (same expressions as in the learners)
+    # --------------------------------------------------
+    def sarsa_update():
+        for s, a, r, s2, a2 in zip(states, actions, rewards, next_states, actions):
+            q_s = Q.row(s)
+            q_s[a] += alpha * (r + discount * Q.read_row(s2)[a2] - q_s[a])
+
+    def q_learning_update():
+        for s, a, r, s2 in zip(states, actions, rewards, next_states):
+            best_next_q = max(Q.read_row(s2).tolist())
+            q_s = Q.row(s)
+            q_s[a] += alpha * (r + discount * best_next_q - q_s[a])
+
+    # Monte Carlo: whole episodes of 100 steps
+    T = 100
+    ep_states = np.asarray(states[:T])
+    ep_actions = np.asarray(actions[:T])
+    ep_rewards = np.zeros(T)
+    ep_rewards[-1] = 1.0
+    powers = discount ** np.arange(T, dtype=np.float64)
+    n_episodes = max(n // T, 1)
+
+    def mc_update():
+        for _ in range(n_episodes):
+            G = discounted_returns(ep_rewards, powers)
+            keys = ep_states * Q.n_actions + ep_actions
+            _, first = np.unique(keys, return_index=True)
+            s, a = ep_states[first], ep_actions[first]
+            Q.add(s, a, alpha * (G[first] - Q.gather(s, a)))
+
+    batch_states = rng.integers(env.n_states, size=1024)
+    batch_actions = rng.integers(env.n_actions, size=1024)
+    batch_targets = rng.standard_normal(1024)
+
+    def td_update():
+        for _ in range(n_batches):
+            Q.td_update(batch_states, batch_actions, batch_targets, alpha)
+
+    results["sarsa_update"] = _rate(n, _best_time(sarsa_update, repeat))
+    results["q_learning_update"] = _rate(n, _best_time(q_learning_update, repeat))
+    results["mc_episode_update"] = _rate(
+        n_episodes * T, _best_time(mc_update, repeat)
+    )
+    results["td_update_batch"] = _rate(
+        n_batches * len(batch_states), _best_time(td_update, repeat)
+    )
+
+    return results
+
+
+# ============================================================
+# 3. End-to-End Training
+# ============================================================
+
+def end_to_end(config, learners=None, episodes=2000, seed=0, memory=True):
+    """
+    Train every learner once on one map.
+
+    Inputs:
+        config   → ExperimentConfig of the map
+        learners → names from LEARNERS (default: all)
+        episodes → training episodes per learner
+        memory   → also measure peak traced memory (extra run)
+
+    Returns:
+        {learner: {"episodes", "env_steps", "seconds",
+                   "episodes_per_sec", "steps_per_sec",
+                   "success_rate", "peak_memory_bytes"}}
+    """
+
+    if learners is None:
+        learners = list(LEARNERS)
+
+    config = config.replace(num_episodes=episodes)
+    env = FrozenLakeEnv(config)
+    results = {}
+
+    for name in learners:
+        train = LEARNERS[name]
+
+        start = time.perf_counter()
+        _, metrics = train(env, seed=seed)
+        seconds = time.perf_counter() - start
+
+        env_steps = int(np.sum(metrics["steps"], dtype=np.int64))
+        result = {
+            "episodes": metrics.count,
+            "env_steps": env_steps,
+            "seconds": seconds,
+            "episodes_per_sec": metrics.count / seconds,
+            "steps_per_sec": env_steps / seconds,
+            "success_rate": float(np.mean(metrics["success"])),
+            "peak_memory_bytes": None,
+        }
+
+        # tracemalloc slows allocation down, so it gets its own run
+        if memory:
+            tracemalloc.start()
+            train(env, seed=seed)
+            result["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        results[name] = result
+
+    return results
+
+
+# ============================================================
+# 4. Full Suite
+# ============================================================
+
+def run_benchmarks(maps=None, learners=None, episodes=2000,
+                   micro_ops=100000, repeat=5, memory=True, seed=0):
+    """
+    Run the microbenchmarks and every end-to-end benchmark.
+
+    Returns the report dictionary that is written as JSON.
+    """
+
+    if maps is None:
+        maps = default_maps()
+
+    report = {
+        "machine": machine_info(),
+        "settings": {
+            "episodes": episodes, "micro_ops": micro_ops,
+            "repeat": repeat, "seed": seed,
+        },
+        "micro": micro_benchmarks(micro_ops, repeat, seed),
+        "end_to_end": {},
+    }
+
+    for map_name, config in maps.items():
+        report["end_to_end"][map_name] = end_to_end(
+            config, learners, episodes, seed, memory
+        )
+
+    return report
+
+
+def print_report(report):
+    """
+    Print the headline numbers of a report.
+    """
+
+    print("Microbenchmarks:")
+    for name, r in report["micro"].items():
+        print(f"  {name:<22} {r['ops_per_sec']:>14,.0f} ops/s"
+              f"  {r['ns_per_op']:>9.1f} ns/op")
+
+    print("\nEnd-to-end:")
+    for map_name, learners in report["end_to_end"].items():
+        for name, r in learners.items():
+            memory = r["peak_memory_bytes"]
+            memory = f"{memory / 2**20:8.2f} MiB" if memory is not None else ""
+            print(f"  {map_name:<7} {name:<22}"
+                  f" {r['episodes_per_sec']:>10,.0f} ep/s"
+                  f" {r['steps_per_sec']:>12,.0f} steps/s  {memory}")
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description="Frozen Lake benchmarks.")
+    parser.add_argument("--out", default=None, help="write the JSON report here")
+    parser.add_argument("--maps", nargs="+", default=None,
+                        help="subset of: 4x4 10x10 25x25 50x50")
+    parser.add_argument("--learners", nargs="+", choices=list(LEARNERS),
+                        default=None)
+    parser.add_argument("--episodes", type=int, default=2000)
+    parser.add_argument("--micro-ops", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the tracemalloc runs")
+    parser.add_argument("--quick", action="store_true",
+                        help="200 episodes, 20000 micro ops, 2 repeats")
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        args.episodes, args.micro_ops, args.repeat = 200, 20000, 2
+
+    maps = default_maps()
+    if args.maps is not None:
+        maps = {name: maps[name] for name in args.maps}
+
+    report = run_benchmarks(
+        maps, args.learners, args.episodes, args.micro_ops,
+        args.repeat, not args.no_memory, args.seed
+    )
+
+    print_report(report)
+
+    if args.out is not None:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved report to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+checkpoint.py
+
+Checkpoint / resume support for long training runs.
+
+A checkpoint is a single compressed .npz file holding:
+- the stored Q-table rows (only the allocated blocks of a BlockQTable)
+- the number of finished episodes
+- the recorded per-episode metrics (typed arrays)
+- the running statistics
+- the state of the learner's random number generator
+
+Learners take:
+    checkpointer → Checkpointer(path, every=N), saves every N episodes
+                   and once more when training ends
+    resume_from  → path of a checkpoint to continue from
+
+On resume, the saved rows are written into the learner's own empty
+table (new_qtable), so the storage named in the config is kept.
+"""
+
+import json
+import os
+
+import numpy as np
+
+from metrics import FIELDS
+from qtable import QTable, qtable_arrays, fill_qtable
+from stats import RunningStats
+
+
+# ============================================================
+# 1. Random Generator State
+# ============================================================
+
+def _rng_state(rng):
+    """
+    JSON-serializable state of a random.Random or numpy Generator.
+    """
+
+    if isinstance(rng, np.random.Generator):
+        return {"kind": "numpy", "state": rng.bit_generator.state}
+
+    version, internal, gauss_next = rng.getstate()
+    return {"kind": "python", "state": [version, list(internal), gauss_next]}
+
+
+def _set_rng_state(rng, saved):
+    """
+    Restore a state produced by _rng_state into rng (in place).
+    """
+
+    if saved["kind"] == "numpy":
+        rng.bit_generator.state = saved["state"]
+    else:
+        version, internal, gauss_next = saved["state"]
+        rng.setstate((version, tuple(internal), gauss_next))
+
+
+# ============================================================
+# 2. Save / Load
+# ============================================================
+
+def save_checkpoint(path, Q, metrics, rng=None):
+    """
+    Write one checkpoint file (atomically: temp file + rename).
+
+    Inputs:
+        path    → destination file (.npz)
+        Q       → QTable or BlockQTable
+        metrics → MetricsRecorder
+        rng     → random.Random or numpy Generator used by the learner
+    """
+
+    stats = metrics.stats.state() if metrics.stats is not None else None
+    header = {
+        "episode": metrics.count,
+        "n_states": Q.n_states,
+        "rng": _rng_state(rng) if rng is not None else None,
+        "stats": stats,
+        "meta": metrics.meta,
+    }
+
+    arrays = {name: np.asarray(metrics[name]) for name in FIELDS}
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez_compressed(
+            f,
+            header=np.array(json.dumps(header)),
+            **qtable_arrays(Q),
+            **arrays
+        )
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path, metrics, rng=None, Q=None):
+    """
+    Restore a checkpoint into a fresh MetricsRecorder and rng.
+
+    Inputs:
+        path    → checkpoint file written by save_checkpoint
+        metrics → empty MetricsRecorder to fill
+        rng     → generator whose state is restored (in place)
+        Q       → empty table to fill, e.g. new_qtable(env, config)
+                  (default: a dense QTable)
+
+    Returns:
+        Q       → the table with the saved values
+        episode → number of episodes already trained
+    """
+
+    with np.load(path) as data:
+        header = json.loads(str(data["header"]))
+        if Q is None:
+            Q = QTable(header.get("n_states", len(data["q_values"])))
+        fill_qtable(Q, data)
+        arrays = [data[name] for name in FIELDS]
+
+    # Refill the recorded history without touching the stats,
+    # then put the saved stats back as they were
+    stats, metrics.stats = metrics.stats, None
+    metrics.record_batch(*arrays)
+    metrics.count = header["episode"]
+
+    if header["stats"] is not None:
+        stats = RunningStats.from_state(header["stats"])
+    metrics.stats = stats
+    metrics.meta.update(header["meta"])
+
+    if rng is not None and header["rng"] is not None:
+        _set_rng_state(rng, header["rng"])
+
+    return Q, header["episode"]
+
+
+# ============================================================
+# 3. Periodic Saving
+# ============================================================
+
+class Checkpointer:
+    """
+    Saves a checkpoint every `every` finished episodes.
+    """
+
+    def __init__(self, path, every=10000):
+        """
+        Inputs:
+            path  → checkpoint file (.npz), overwritten each time
+            every → episodes between checkpoints
+        """
+
+        self.path = path
+        self.every = every
+
+        # Episode count at which the next checkpoint is due
+        # (set on first call, so resumed runs continue the schedule)
+        self._next_save = None
+
+    def update(self, Q, metrics, rng=None):
+        """
+        Call after every episode (or batch of episodes).
+
+        Returns:
+            True if a checkpoint was written
+        """
+
+        if self._next_save is None:
+            self._next_save = (metrics.count - 1) // self.every * self.every + self.every
+
+        if metrics.count < self._next_save:
+            return False
+
+        self._next_save = (metrics.count // self.every + 1) * self.every
+        self.save(Q, metrics, rng)
+        return True
+
+    def save(self, Q, metrics, rng=None):
+        """
+        Write a checkpoint now.
+        """
+        save_checkpoint(self.path, Q, metrics, rng)
@@ -7,8 +7,16 @@ Central configuration file for:
 - Reinforcement learning hyperparameters
 
 Changing values here modifies the entire experiment.
+
+The module-level constants are the defaults. Code that trains or builds
+environments takes an ExperimentConfig (defined at the bottom), so one
+process can run many different configurations side by side:
+
+    cfg = DEFAULT_CONFIG.replace(alpha=0.1, num_episodes=50000)
 """
 
+from dataclasses import dataclass, replace
+
 # --------------------------------------------------
 # GRID CONFIGURATION
 # --------------------------------------------------
@@ -66,4 +74,58 @@ EPSILON = 0.01
 NUM_EPISODES = 250000
 
 # Maximum steps allowed in one episode
-MAX_STEPS_PER_EPISODE = 1000
\ No newline at end of file
+MAX_STEPS_PER_EPISODE = 1000
+
+# Learning rate of incremental Monte Carlo control
+MC_ALPHA = 0.01
+
+# Dyna-Q: simulated (planning) updates per real environment step
+PLANNING_STEPS = 10
+
+# --------------------------------------------------
+# EXPERIMENT CONFIGURATION OBJECT
+# --------------------------------------------------
+
+@dataclass(frozen=True)
+class ExperimentConfig:
+    """
+    Immutable bundle of every setting of one experiment.
+
+    Defaults come from the constants above.
+    """
+
+    # Grid
+    grid_rows: int = GRID_ROWS
+    grid_cols: int = GRID_COLS
+    start_state: tuple = START_STATE
+    goal_state: tuple = GOAL_STATE
+    holes: tuple = tuple(HOLES)
+
+    # Generated map (env.generate_map) instead of `holes`
+    # when hole_density is set
+    hole_density: float = None
+    map_seed: int = 0
+
+    # RL hyperparameters
+    discount: float = DISCOUNT
+    alpha: float = ALPHA
+    epsilon: float = EPSILON
+    num_episodes: int = NUM_EPISODES
+    max_steps_per_episode: int = MAX_STEPS_PER_EPISODE
+    mc_alpha: float = MC_ALPHA
+    planning_steps: int = PLANNING_STEPS
+
+    # Q-table storage: "dense" or "block" (lazily allocated,
+    # for huge maps), and the block table's memory budget in bytes
+    q_storage: str = "dense"
+    q_max_bytes: int = None
+
+    def replace(self, **changes):
+        """
+        Copy of this config with some fields changed.
+        """
+        return replace(self, **changes)
+
+
+# Configuration built from the constants above
+DEFAULT_CONFIG = ExperimentConfig()
\ No newline at end of file
@@ -0,0 +1,101 @@
+"""
+convergence.py
+
+Convergence detection for early stopping of the tabular learners.
+
+Every `check_every` episodes the monitor compares the Q-table with
+the one from the previous checkpoint. Training is considered converged
+when either (or both, whichever comes first) of these holds:
+
+- tol      → max |ΔQ| since the previous checkpoint is below tol
+- patience → the greedy policy has not changed for `patience`
+             consecutive checkpoints
+
+The policy is compared on learned states only (any non-zero Q-value):
+the argmax of an all-zero row is an arbitrary action, so including
+those rows would let a table that never reached the goal look stable.
+A state becoming learned counts as a policy change.
+
+Neither criterion is checked before the goal reward has reached the
+table (some Q-value > 0; the goal's +1 is the only positive reward).
+Until then a learner that keeps falling into the same holes can have
+a perfectly stable table without ever finding the goal.
+"""
+
+import numpy as np
+
+
+class ConvergenceMonitor:
+
+    def __init__(self, check_every=1000, tol=None, patience=None):
+        """
+        Inputs:
+            check_every → episodes between checkpoints
+            tol         → max |ΔQ| threshold (None = not used)
+            patience    → checkpoints with an unchanged greedy policy
+                          (None = not used)
+        """
+
+        if tol is None and patience is None:
+            raise ValueError("ConvergenceMonitor needs tol and/or patience")
+
+        self.check_every = check_every
+        self.tol = tol
+        self.patience = patience
+
+        # Episode count at which the next checkpoint is due
+        self._next_check = check_every
+
+        # Snapshot from the previous checkpoint
+        self._last_values = None
+        self._last_policy = None
+
+        self.stable_checks = 0
+        self.last_delta = None
+        self.converged_at = None
+
+    def update(self, Q, episode):
+        """
+        Call after every episode (or batch of episodes).
+
+        Inputs:
+            Q       → QTable being trained
+            episode → number of finished episodes so far
+
+        Returns:
+            True once training has converged
+        """
+
+        if episode < self._next_check:
+            return False
+
+        # Skip ahead past every checkpoint reached in this call
+        self._next_check = (episode // self.check_every + 1) * self.check_every
+
+        values = Q.values
+
+        # Greedy action of learned states, -1 for the rest
+        policy = np.where(values.any(axis=1), values.argmax(axis=1), -1)
+        converged = False
+
+        # Nothing to converge to before the goal was ever reached
+        if self._last_values is not None and values.max() > 0:
+
+            self.last_delta = float(np.abs(values - self._last_values).max())
+            if self.tol is not None and self.last_delta < self.tol:
+                converged = True
+
+            if np.array_equal(policy, self._last_policy):
+                self.stable_checks += 1
+            else:
+                self.stable_checks = 0
+            if self.patience is not None and self.stable_checks >= self.patience:
+                converged = True
+
+        self._last_values = values.copy()
+        self._last_policy = policy
+
+        if converged:
+            self.converged_at = episode
+
+        return converged
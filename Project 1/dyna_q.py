@@ -0,0 +1,229 @@
+"""
+Dyna-Q (Q-learning + planning with a learned model)
+
+FrozenLakeEnv is deterministic, so every real transition
+(s, a) → (r, s', done) seen once is known exactly. It is stored in
+an array-backed model, and the model is replayed for extra updates:
+
+real step:     Q(s,a) ← Q(s,a) + α [ r + γ max_a' Q(s',a') - Q(s,a) ]
+planning step: the same update for a (s, a) pair drawn uniformly
+               from the pairs observed so far, using the model
+
+config.planning_steps planning updates are made per real step.
+They are applied in vectorized batches (QTable.td_update) every
+plan_every real steps and at the end of each episode, so the
+planning ratio holds while the NumPy overhead is paid once per batch.
+"""
+
+import random
+
+import numpy as np
+
+from action_selection import epsilon_greedy
+from metrics import MetricsRecorder
+from stats import log_progress
+from checkpoint import load_checkpoint
+from qtable import new_qtable
+
+
+class TabularModel:
+    """
+    Deterministic model of observed transitions, indexed by the
+    flat key state * n_actions + action.
+    """
+
+    def __init__(self, n_states, n_actions):
+
+        self.n_actions = n_actions
+
+        # Next state per key (-1 = never observed), reward, done
+        self.next_state = np.full(n_states * n_actions, -1, dtype=np.int64)
+        self.reward = np.zeros(n_states * n_actions, dtype=np.int8)
+        self.done = np.zeros(n_states * n_actions, dtype=bool)
+
+        # Observed keys in order of discovery (for uniform sampling)
+        self.keys = np.zeros(n_states * n_actions, dtype=np.int64)
+        self.count = 0
+
+    def add(self, state, action, reward, next_state, done):
+        """
+        Store one real transition (only the first time it is seen).
+        """
+
+        key = state * self.n_actions + action
+        if self.next_state[key] >= 0:
+            return
+
+        self.next_state[key] = next_state
+        self.reward[key] = reward
+        self.done[key] = done
+
+        self.keys[self.count] = key
+        self.count += 1
+
+    def sample(self, n, rng):
+        """
+        n observed transitions drawn uniformly (with replacement).
+
+        Returns:
+            states, actions, rewards, next_states, dones (arrays)
+        """
+
+        keys = self.keys[rng.integers(self.count, size=n)]
+        states, actions = np.divmod(keys, self.n_actions)
+
+        return (states, actions, self.reward[keys],
+                self.next_state[keys], self.done[keys])
+
+
+def dyna_q(env, seed=None, config=None, plan_every=16, duplicates="add",
+           metrics=None, log_every=None, monitor=None, checkpointer=None,
+           resume_from=None, profiler=None, evaluator=None):
+    """
+    Q-learning with config.planning_steps model updates per real step.
+
+    Inputs (besides those shared with q_learning):
+        plan_every → real steps between planning batches
+        duplicates → how repeated pairs in one planning batch are
+                     combined (see QTable.td_update)
+
+    The model is not part of checkpoints: after resume_from it is
+    rebuilt from new experience.
+    """
+
+    # Experiment settings (default: the ones the env was built with)
+    if config is None:
+        config = env.config
+
+    num_episodes = config.num_episodes
+    max_steps = config.max_steps_per_episode
+    alpha, discount, epsilon = config.alpha, config.discount, config.epsilon
+    planning_steps = config.planning_steps
+
+    Q = new_qtable(env, config)
+    model = TabularModel(env.n_states, env.n_actions)
+
+    # Private random streams (reproducible when seed is given):
+    # one for acting, one for drawing planning samples
+    rng = random.Random(seed)
+    plan_rng = np.random.default_rng(seed)
+
+    # Per-episode reward / steps / success history
+    if metrics is None:
+        metrics = MetricsRecorder(num_episodes, max_steps=max_steps)
+
+    # Continue from a saved checkpoint
+    start = 0
+    if resume_from is not None:
+        Q, start = load_checkpoint(resume_from, metrics, rng, Q)
+
+    def plan(n):
+        """
+        n planning updates in one vectorized batch.
+        """
+
+        states, actions, rewards, next_states, dones = model.sample(n, plan_rng)
+
+        # Greedy value of the modelled next state (0 if terminal)
+        best_next_q = Q.rows(next_states).max(axis=1) * ~dones
+
+        Q.td_update(
+            states, actions,
+            rewards + discount * best_next_q,
+            alpha, duplicates
+        )
+
+    # Swapped for timed versions on profiled episodes
+    select, step_index, run_planning = epsilon_greedy, env.step_index, plan
+
+    for episode in range(start, num_episodes):
+
+        if profiler is not None:
+            select, step_index, run_planning = profiler.start(
+                ("action_selection", epsilon_greedy),
+                ("env_step", env.step_index),
+                ("planning", plan),
+            )
+
+        state = env.reset()
+        total_reward = 0
+
+        # Planning updates owed since the last batch
+        pending = 0
+
+        for step in range(max_steps):
+
+            # Select action via epsilon-greedy
+            action = select(Q, state, epsilon, rng)
+
+            # Execute action
+            next_state, reward, done = step_index(state, action)
+
+            # Direct RL: Q-learning update from the real transition
+            best_next_q = max(Q.read_row(next_state).tolist())
+            q_s = Q.row(state)
+            q_s[action] += alpha * (
+                reward +
+                discount * best_next_q -
+                q_s[action]
+            )
+
+            # Model learning
+            model.add(state, action, reward, next_state, done)
+
+            # Planning (batched)
+            pending += planning_steps
+            if pending and (done or (step + 1) % plan_every == 0):
+                run_planning(pending)
+                pending = 0
+
+            total_reward += reward
+            state = next_state
+
+            if done:
+                break
+
+        # Steps of a truncated episode still owe their planning updates
+        if pending:
+            run_planning(pending)
+
+        # Q was updated in place through row views
+        Q.touch()
+
+        if profiler is not None:
+            profiler.mark("q_update")
+
+        # Recorded for every episode, including ones cut off
+        # at MAX_STEPS_PER_EPISODE
+        metrics.record(total_reward, step + 1, 1 if reward == 1 else 0)
+
+        if log_every:
+            log_progress("Dyna-Q", metrics, log_every, metrics.count - 1)
+
+        # Early stopping once the monitor reports convergence
+        if monitor is not None and monitor.update(Q, metrics.count):
+            break
+
+        if checkpointer is not None:
+            checkpointer.update(Q, metrics, rng)
+
+        # Greedy-policy evaluation every K episodes
+        if evaluator is not None:
+            evaluator.update(Q, metrics.count)
+
+        if profiler is not None:
+            profiler.mark("bookkeeping")
+
+    if monitor is not None:
+        metrics.meta["converged_episode"] = monitor.converged_at
+
+    if profiler is not None:
+        metrics.meta["profile"] = profiler.report()
+
+    if evaluator is not None:
+        metrics.meta["evaluation"] = evaluator.history
+
+    if checkpointer is not None:
+        checkpointer.save(Q, metrics, rng)
+
+    return Q, metrics
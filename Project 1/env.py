@@ -8,29 +8,289 @@ This environment:
 - Tracks agent position
 - Returns rewards
 - Determines episode termination
+
+All transitions are deterministic, so the full
+next_state / reward / done tables are computed once
+in __init__ and every step is just a table lookup.
+
+step_index reads a copy of the tables as nested tuples of Python
+scalars, the fastest lookup, but about 440 bytes per state. Above
+STEP_TABLE_MAX_STATES states it reads the NumPy tables directly
+through memoryviews instead (no copy, slightly slower per step).
+
+Maps can also be generated: generate_map draws a seeded boolean
+hole mask at a target density and redraws it until a start → goal
+path exists (checked with a vectorized BFS, reachable_mask).
 """
 
-from config import *
+import numpy as np
+
+from config import ACTIONS, ACTION_TO_DELTA, DEFAULT_CONFIG
+
+# Largest map (in states) whose step_index uses nested tuples
+# (~29 MB at this size, ~440 MB on a 1000x1000 map)
+STEP_TABLE_MAX_STATES = 1 << 16
+
+
+# ============================================================
+# 1. Map Generation
+# ============================================================
+
+def reachable_mask(hole_mask, start, goal=None):
+    """
+    Cells reachable from start without entering a hole.
+
+    Breadth-first search over whole frontiers at a time (NumPy),
+    so every cell is visited once: O(rows * cols).
+
+    Inputs:
+        hole_mask → (rows, cols) boolean array, True = hole
+        start     → (row, col)
+        goal      → optional (row, col): stop as soon as it is reached
+
+    Returns:
+        (rows, cols) boolean array, True = reachable
+    """
+
+    rows, cols = hole_mask.shape
+    free = ~hole_mask.ravel()
+
+    seen = np.zeros(rows * cols, dtype=bool)
+    start_index = start[0] * cols + start[1]
+    goal_index = None if goal is None else goal[0] * cols + goal[1]
+
+    seen[start_index] = True
+    frontier = np.array([start_index])
+
+    while frontier.size:
+
+        r, c = np.divmod(frontier, cols)
+        neighbours = np.concatenate((
+            frontier[r > 0] - cols,          # UP
+            frontier[r < rows - 1] + cols,   # DOWN
+            frontier[c > 0] - 1,             # LEFT
+            frontier[c < cols - 1] + 1,      # RIGHT
+        ))
+
+        # The goal counts even if it is marked as a hole
+        open_cell = free[neighbours]
+        if goal_index is not None:
+            open_cell |= neighbours == goal_index
+
+        frontier = np.unique(neighbours[open_cell & ~seen[neighbours]])
+        seen[frontier] = True
+
+        if goal_index is not None and seen[goal_index]:
+            break
+
+    return seen.reshape(rows, cols)
+
+
+def generate_map(rows, cols, hole_density, seed=None, start=(0, 0),
+                 goal=None, max_tries=100):
+    """
+    Random hole mask with a guaranteed start → goal path.
+
+    Inputs:
+        rows, cols   → grid size
+        hole_density → probability of each cell being a hole
+        seed         → random seed (same seed → same map)
+        start, goal  → kept free (goal default: bottom-right corner)
+        max_tries    → redraws allowed before giving up
+
+    Returns:
+        (rows, cols) boolean NumPy array, True = hole
+
+    Above a density of about 0.4 most random maps have no path,
+    so generation then usually fails with ValueError.
+    """
+
+    if goal is None:
+        goal = (rows - 1, cols - 1)
+
+    rng = np.random.default_rng(seed)
+
+    for _ in range(max_tries):
+
+        hole_mask = rng.random((rows, cols)) < hole_density
+        hole_mask[start] = False
+        hole_mask[goal] = False
+
+        if reachable_mask(hole_mask, start, goal)[goal]:
+            return hole_mask
+
+    raise ValueError(
+        f"no solvable {rows}x{cols} map at hole density {hole_density} "
+        f"in {max_tries} tries"
+    )
+
+
+# ============================================================
+# 2. Environment
+# ============================================================
 
 class FrozenLakeEnv:
 
-    def __init__(self):
+    def __init__(self, config=None, hole_mask=None):
         """
-        Initialize environment using config parameters.
+        Initialize environment from an ExperimentConfig
+        (default: config.DEFAULT_CONFIG).
+
+        The holes come from (first match):
+            hole_mask          → (rows, cols) boolean array, True = hole
+            config.hole_density → map generated with generate_map
+                                  and config.map_seed
+            config.holes        → list of (row, col)
+
+        A hole_mask must match config.grid_rows × config.grid_cols
+        (ValueError otherwise). Without a config, one is derived from
+        DEFAULT_CONFIG with the mask's size and the goal in the
+        bottom-right corner, as generate_map assumes by default.
+        Either way the mask is written into the stored config
+        (holes = its hole cells, hole_density = None), so
+        FrozenLakeEnv(env.config) rebuilds the same map and the
+        config hash of a sweep tells different masks apart.
         """
 
-        self.rows = GRID_ROWS
-        self.cols = GRID_COLS
+        if hole_mask is not None:
+            hole_mask = np.array(hole_mask, dtype=bool)
+            rows, cols = hole_mask.shape
+            mask_holes = tuple(map(tuple, np.argwhere(hole_mask).tolist()))
+
+            if config is None:
+                config = DEFAULT_CONFIG.replace(
+                    grid_rows=rows, grid_cols=cols,
+                    goal_state=(rows - 1, cols - 1)
+                )
+            elif (rows, cols) != (config.grid_rows, config.grid_cols):
+                raise ValueError(
+                    f"hole_mask shape {(rows, cols)} does not match the "
+                    f"config grid {(config.grid_rows, config.grid_cols)}"
+                )
+
+            config = config.replace(holes=mask_holes, hole_density=None)
+
+        self.config = config if config is not None else DEFAULT_CONFIG
+
+        self.rows = self.config.grid_rows
+        self.cols = self.config.grid_cols
+
+        self.start_state = tuple(self.config.start_state)
+        self.goal_state = tuple(self.config.goal_state)
+
+        if hole_mask is None and self.config.hole_density is not None:
+            hole_mask = generate_map(
+                self.rows, self.cols, self.config.hole_density,
+                seed=self.config.map_seed,
+                start=self.start_state, goal=self.goal_state
+            )
+
+        if hole_mask is not None:
+            self.hole_mask = hole_mask
+            holes = map(tuple, np.argwhere(self.hole_mask).tolist())
+        else:
+            holes = map(tuple, self.config.holes)
+            self.hole_mask = np.zeros((self.rows, self.cols), dtype=bool)
+            for r, c in self.config.holes:
+                self.hole_mask[r, c] = True
 
-        self.start_state = START_STATE
-        self.goal_state = GOAL_STATE
-        self.holes = set(HOLES)  # convert to set for fast lookup
+        self.holes = set(holes)  # set for fast lookup
 
         # Current agent state
         self.state = self.start_state
 
-        # Generate visual grid (for plotting)
-        self.grid = self._generate_grid()
+        # Visual grid (for plotting), built on first use
+        self._grid = None
+
+        # Precompute transition tables indexed by [state, action_id]
+        self.n_states = self.rows * self.cols
+        self.n_actions = len(ACTIONS)
+        self.next_state, self.reward, self.done = self._build_tables()
+
+        # True for holes and the goal (episode ends on entering them)
+        self.terminal = np.zeros(self.n_states, dtype=bool)
+        self.terminal[self.next_state[self.done]] = True
+
+        # Python-level copy of the tables for step_index (built on first use)
+        self._step_table = None
+
+        # Large maps: flat lookups into the NumPy tables (see module docstring)
+        if self.n_states > STEP_TABLE_MAX_STATES:
+            self.step_index = self._step_index_flat
+
+    def _build_tables(self):
+        """
+        Compute next_state[s, a], reward[s, a] and done[s, a]
+        for every state index s and action id a.
+        """
+
+        states = np.arange(self.n_states)
+        r = states // self.cols
+        c = states % self.cols
+
+        # (n_actions, 2) array of (dr, dc) in ACTIONS order
+        deltas = np.array([ACTION_TO_DELTA[a] for a in ACTIONS])
+
+        # Move and clamp to the grid, shape (n_states, n_actions)
+        new_r = np.clip(r[:, None] + deltas[:, 0], 0, self.rows - 1)
+        new_c = np.clip(c[:, None] + deltas[:, 1], 0, self.cols - 1)
+        next_state = new_r * self.cols + new_c
+
+        hole_mask = self.hole_mask.ravel()
+
+        at_goal = next_state == self.state_to_index(self.goal_state)
+        in_hole = hole_mask[next_state] & ~at_goal
+
+        # +1 at goal, -1 in a hole, 0 otherwise
+        reward = at_goal.astype(np.int8) - in_hole.astype(np.int8)
+        done = at_goal | in_hole
+
+        return next_state, reward, done
+
+    def predecessor_index(self):
+        """
+        Reverse transition structure in CSR form.
+
+        Returns:
+            indptr → array of length n_states + 1
+            keys   → flat (state * n_actions + action) keys, grouped so that
+                     keys[indptr[s]:indptr[s + 1]] are all the pairs
+                     whose next state is s
+        """
+
+        flat_next = self.next_state.ravel()
+        keys = np.argsort(flat_next, kind="stable")
+
+        counts = np.bincount(flat_next, minlength=self.n_states)
+        indptr = np.zeros(self.n_states + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+
+        return indptr, keys
+
+    def _build_step_table(self):
+        """
+        Convert the tables into nested tuples of Python scalars,
+        so that step_index is a pure list lookup.
+        """
+
+        self._step_table = [
+            tuple(zip(ns, rw, dn))
+            for ns, rw, dn in zip(
+                self.next_state.tolist(),
+                self.reward.tolist(),
+                self.done.tolist()
+            )
+        ]
+        return self._step_table
+
+    @property
+    def grid(self):
+        """
+        2D list of tile letters (see _generate_grid).
+        """
+        if self._grid is None:
+            self._grid = self._generate_grid()
+        return self._grid
 
     def _generate_grid(self):
         """
@@ -69,9 +329,12 @@ class FrozenLakeEnv:
         self.state = self.start_state
         return self.state_to_index(self.state)
 
-    def step(self, action):
+    def step_index(self, state, action):
         """
-        Perform one action in the environment.
+        Fast path: one transition from an integer state index
+        with an integer action id.
+
+        Does not touch self.state; the caller tracks the state.
 
         Returns:
             next_state_index
@@ -79,32 +342,48 @@ class FrozenLakeEnv:
             done (True if terminal state)
         """
 
-        # Current position
-        r, c = self.state
+        table = self._step_table
+        if table is None:
+            table = self._build_step_table()
+
+        return table[state][action]
+
+    def _step_index_flat(self, state, action):
+        """
+        step_index for large maps: the same lookup through memoryviews
+        of the flat NumPy tables (they return Python scalars).
+        """
+
+        table = self._step_table
+        if table is None:
+            table = self._step_table = tuple(
+                memoryview(t.reshape(-1))
+                for t in (self.next_state, self.reward, self.done)
+            )
 
-        # Convert action into movement direction
-        dr, dc = ACTION_TO_DELTA[action]
+        next_states, rewards, dones = table
+        key = state * self.n_actions + action
+        return next_states[key], rewards[key], dones[key]
 
-        # Compute new position
-        new_r = min(max(r + dr, 0), self.rows - 1)
-        new_c = min(max(c + dc, 0), self.cols - 1)
+    def step(self, action):
+        """
+        Perform one action (by name) from the current agent position.
 
-        self.state = (new_r, new_c)
+        Compatibility wrapper around step_index.
 
-        # -------------------------------
-        # Check terminal conditions
-        # -------------------------------
+        Returns:
+            next_state_index
+            reward
+            done (True if terminal state)
+        """
 
-        # Goal reached
-        if self.state == self.goal_state:
-            return self.state_to_index(self.state), 1, True
+        next_state, reward, done = self.step_index(
+            self.state_to_index(self.state), ACTIONS.index(action)
+        )
 
-        # Fell into hole
-        if self.state in self.holes:
-            return self.state_to_index(self.state), -1, True
+        self.state = self.index_to_state(next_state)
 
-        # Normal step
-        return self.state_to_index(self.state), 0, False
+        return next_state, reward, done
 
     def state_to_index(self, state):
         """
@@ -119,4 +398,89 @@ class FrozenLakeEnv:
         """
         r = index // self.cols
         c = index % self.cols
-        return (r, c)
\ No newline at end of file
+        return (r, c)
+
+
+# ============================================================
+# 3. Batched Environment
+# ============================================================
+
+class BatchFrozenLakeEnv:
+    """
+    N independent copies of FrozenLakeEnv stepped in lockstep.
+
+    All agent positions live in one integer array and every step
+    is a single lookup into the precomputed transition tables.
+    Finished episodes are reset to the start state automatically.
+    """
+
+    def __init__(self, n_envs, env=None, max_steps=None):
+        """
+        Inputs:
+            n_envs    → number of parallel episodes
+            env       → FrozenLakeEnv providing the map (default: new one)
+            max_steps → episode length limit (truncation)
+                        (default: env.config.max_steps_per_episode)
+        """
+
+        self.env = env if env is not None else FrozenLakeEnv()
+        self.n_envs = n_envs
+        if max_steps is None:
+            max_steps = self.env.config.max_steps_per_episode
+        self.max_steps = max_steps
+
+        self.n_states = self.env.n_states
+        self.n_actions = self.env.n_actions
+        self.start_index = self.env.state_to_index(self.env.start_state)
+
+        # Shared (read-only) transition tables
+        self.next_state = self.env.next_state
+        self.reward = self.env.reward
+        self.done = self.env.done
+
+        # Current state index and step count of every slot
+        self.states = np.full(n_envs, self.start_index, dtype=np.int64)
+        self.lengths = np.zeros(n_envs, dtype=np.int64)
+
+        # Length of the episode each slot most recently finished
+        self.episode_lengths = np.zeros(n_envs, dtype=np.int64)
+
+    def reset(self):
+        """
+        Reset every slot to the start state.
+        Returns array of start state indices.
+        """
+
+        self.states.fill(self.start_index)
+        self.lengths.fill(0)
+        return self.states.copy()
+
+    def step(self, actions):
+        """
+        Apply one action id per slot.
+
+        Returns:
+            next_states → state reached by each slot (before auto-reset)
+            rewards     → reward of each transition
+            dones       → True where a terminal state was reached
+            truncated   → True where max_steps ran out without terminating
+
+        Slots that are done or truncated are reset, so self.states
+        already holds the start state for them and
+        self.episode_lengths holds the length of the finished episode.
+        """
+
+        next_states = self.next_state[self.states, actions]
+        rewards = self.reward[self.states, actions]
+        dones = self.done[self.states, actions]
+
+        self.lengths += 1
+        truncated = ~dones & (self.lengths >= self.max_steps)
+        ended = dones | truncated
+
+        # Record finished lengths, then auto-reset those slots
+        self.episode_lengths[ended] = self.lengths[ended]
+        self.states = np.where(ended, self.start_index, next_states)
+        self.lengths[ended] = 0
+
+        return next_states, rewards, dones, truncated
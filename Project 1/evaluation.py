@@ -0,0 +1,184 @@
+"""
+evaluation.py
+
+Policy evaluation separate from the training metrics.
+
+The training `success` series comes from ε-greedy episodes, so it
+mixes exploration noise with policy quality. evaluate_policy instead
+runs many rollouts of a fixed Q-table (greedy by default) side by
+side as array operations and reports:
+
+    success_rate   → fraction of rollouts reaching the goal
+    hole_rate      → fraction falling into a hole
+    truncated_rate → fraction cut off at max_steps
+    mean_length    → mean episode length (all rollouts)
+    success_length → mean episode length of successful rollouts
+    loop_rate      → fraction of rollouts that revisited a state
+                     (with a greedy policy without ties, a revisit
+                     means the rollout cycles until max_steps)
+
+Evaluator runs evaluate_policy every K training episodes. Learners
+take evaluator=Evaluator(env, every=K) and store its history in
+metrics.meta["evaluation"].
+"""
+
+import numpy as np
+
+from action_selection import epsilon_greedy_batch
+
+
+# ============================================================
+# 1. Batched Rollouts
+# ============================================================
+
+def evaluate_policy(Q, env, n_episodes=1000, epsilon=0.0, max_steps=None,
+                    seed=None):
+    """
+    Roll out the (ε-)greedy policy of Q from the start state.
+
+    Inputs:
+        Q          → QTable (or BlockQTable)
+        env        → FrozenLakeEnv
+        n_episodes → number of rollouts, all run together
+        epsilon    → exploration rate (0 = greedy, ties broken at random)
+        max_steps  → episode length limit
+                     (default: env.config.max_steps_per_episode)
+        seed       → seed of the rollouts' random stream
+
+    Returns:
+        dictionary of the statistics listed in the module docstring
+    """
+
+    if max_steps is None:
+        max_steps = env.config.max_steps_per_episode
+
+    rng = np.random.default_rng(seed)
+    start = env.state_to_index(env.start_state)
+
+    states = np.full(n_episodes, start, dtype=np.int64)
+    lengths = np.zeros(n_episodes, dtype=np.int64)
+    rewards = np.zeros(n_episodes, dtype=np.int64)
+
+    # States visited by every rollout (for loop detection)
+    path = np.empty((n_episodes, max_steps), dtype=np.int64)
+
+    # Indices of the rollouts still running
+    active = np.arange(n_episodes)
+
+    for t in range(max_steps):
+        if not active.size:
+            break
+
+        s = states[active]
+        path[active, t] = s
+
+        a = epsilon_greedy_batch(Q, s, epsilon, rng)
+        done = env.done[s, a]
+
+        states[active] = env.next_state[s, a]
+        lengths[active] += 1
+
+        ended = active[done]
+        rewards[ended] = env.reward[s[done], a[done]]
+        active = active[~done]
+
+    success = rewards == 1
+    hole = rewards == -1
+
+    return {
+        "episodes": n_episodes,
+        "epsilon": epsilon,
+        "success_rate": float(success.mean()),
+        "hole_rate": float(hole.mean()),
+        "truncated_rate": float(1.0 - success.mean() - hole.mean()),
+        "mean_length": float(lengths.mean()),
+        "success_length": (
+            float(lengths[success].mean()) if success.any() else None
+        ),
+        "loop_rate": float(_revisited(path, lengths).mean()),
+    }
+
+
+def _revisited(path, lengths):
+    """
+    True for every rollout whose path contains a state twice.
+
+    Positions past the end of a rollout are filled with distinct
+    negative numbers, then each row is sorted once: a repeated
+    state shows up as two equal neighbours.
+    """
+
+    n, width = path.shape
+    if width < 2:
+        return np.zeros(n, dtype=bool)
+
+    steps = np.arange(width)
+    padded = np.where(steps < lengths[:, None], path, -1 - steps)
+    padded.sort(axis=1)
+
+    return (padded[:, 1:] == padded[:, :-1]).any(axis=1)
+
+
+# ============================================================
+# 2. Periodic Evaluation During Training
+# ============================================================
+
+class Evaluator:
+    """
+    Runs evaluate_policy every `every` finished training episodes.
+    """
+
+    def __init__(self, env, every=1000, n_episodes=1000, epsilon=0.0,
+                 max_steps=None, seed=0):
+        """
+        Inputs:
+            env        → FrozenLakeEnv the learner trains on
+            every      → training episodes between evaluations
+            n_episodes, epsilon, max_steps → passed to evaluate_policy
+            seed       → seed of the evaluation stream (separate from
+                         the learner's, so training is unaffected)
+        """
+
+        self.env = env
+        self.every = every
+        self.n_episodes = n_episodes
+        self.epsilon = epsilon
+        self.max_steps = max_steps
+        self.rng = np.random.default_rng(seed)
+
+        # Episode count at which the next evaluation is due
+        self._next_eval = every
+
+        # One report per evaluation, each with its "episode"
+        self.history = []
+
+    def update(self, Q, episode):
+        """
+        Call after every episode (or batch of episodes).
+
+        Returns:
+            the new report if an evaluation ran, otherwise None
+        """
+
+        if episode < self._next_eval:
+            return None
+
+        # Skip ahead past every evaluation point reached in this call
+        self._next_eval = (episode // self.every + 1) * self.every
+
+        report = {"episode": episode}
+        report.update(evaluate_policy(
+            Q, self.env, self.n_episodes, self.epsilon, self.max_steps,
+            seed=self.rng.integers(2**63)
+        ))
+        self.history.append(report)
+
+        return report
+
+    def series(self, key):
+        """
+        (episodes, values) arrays of one statistic over the history.
+        """
+        episodes = np.array([r["episode"] for r in self.history])
+        values = np.array([r[key] for r in self.history], dtype=float)
+        return episodes, values
@@ -6,102 +6,179 @@ Main driver script for the Frozen Lake Reinforcement Learning project.
 This file:
 1. Creates the environment
 2. Trains Monte Carlo, SARSA, and Q-learning
+   (concurrently, see runner.py)
 3. Measures training time
 4. Prints learned policies
 5. Plots performance metrics
 6. Plots learned policy paths
+   (or, with --output-dir, writes every figure to disk)
 
 This is the entry point of the entire project.
-"""
 
-import time
-from env import FrozenLakeEnv
-from mc_control import monte_carlo_control
-from sarsa import sarsa
-from q_learning import q_learning
-from misc import (
-    plot_policy_path,
-    print_policy,
-    plot_single_algorithm,
-    plot_comparison,
-)
+Command line (all options are optional):
+
+    python main.py --algorithms sarsa q-learning --episodes 50000
+                   --seed 3 --output-dir figures --save-results run.npz
+                   --no-plots
+
+Heavy modules (NumPy, the learners, matplotlib) are imported only
+after the arguments are parsed, and matplotlib only if figures
+are actually drawn.
+"""
 
-def main():
+import argparse
+
+# Command line name → algorithm name used in runner.ALGORITHMS
+ALGORITHM_CHOICES = {
+    "monte-carlo": "Monte Carlo",
+    "sarsa": "SARSA",
+    "q-learning": "Q-Learning",
+    "dyna-q": "Dyna-Q",
+    "prioritized-sweeping": "Prioritized Sweeping",
+}
+
+# Algorithms trained when --algorithms is not given
+DEFAULT_ALGORITHMS = ["monte-carlo", "sarsa", "q-learning"]
+
+
+def parse_args(argv=None):
+    """
+    Parse command line options.
+    """
+
+    parser = argparse.ArgumentParser(
+        description="Train and compare tabular RL algorithms on Frozen Lake."
+    )
+    parser.add_argument(
+        "--algorithms", nargs="+", choices=list(ALGORITHM_CHOICES),
+        default=DEFAULT_ALGORITHMS,
+        help="algorithms to train (default: monte-carlo sarsa q-learning)"
+    )
+    parser.add_argument(
+        "--episodes", type=int, default=None,
+        help="training episodes per algorithm (default: config.NUM_EPISODES)"
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0,
+        help="run seed (default: 0)"
+    )
+    parser.add_argument(
+        "--processes", type=int, default=None,
+        help="training processes (default: one per CPU)"
+    )
+    parser.add_argument(
+        "--output-dir", default=None,
+        help="write figures to this directory instead of showing them"
+    )
+    parser.add_argument(
+        "--save-results", default=None,
+        help="save Q-tables and metrics to this .npz file"
+    )
+    parser.add_argument(
+        "--no-plots", action="store_true",
+        help="skip all figures"
+    )
+
+    return parser.parse_args(argv)
+
+
+def save_results(path, q_tables, metrics_dict):
+    """
+    Store every Q-table and metric series in one .npz file.
+
+    Keys look like "sarsa_q", "sarsa_rewards", "sarsa_steps", ...
+    """
+
+    import numpy as np
+
+    arrays = {}
+    for name, Q in q_tables.items():
+        key = name.lower().replace(" ", "_").replace("-", "_")
+        arrays[f"{key}_q"] = Q.values
+        for field, values in metrics_dict[name].items():
+            arrays[f"{key}_{field}"] = np.asarray(values)
+
+    np.savez_compressed(path, **arrays)
+
+
+def main(argv=None):
+
+    args = parse_args(argv)
+    names = [ALGORITHM_CHOICES[a] for a in args.algorithms]
+
+    from config import DEFAULT_CONFIG
+    from env import FrozenLakeEnv
+    from runner import run_jobs
+    from misc import print_policy
+
+    # Experiment settings: config.py defaults plus command line overrides
+    config = DEFAULT_CONFIG
+    if args.episodes is not None:
+        config = config.replace(num_episodes=args.episodes)
 
     # -------------------------------------------------
     # Create environment
     # -------------------------------------------------
     # FrozenLakeEnv contains the grid, reward logic,
     # state transitions, and reset/step functions.
-    env = FrozenLakeEnv()
-
-    # Dictionary to store learned Q-tables from each algorithm
-    # This allows us to later plot policies for each method.
-    q_tables = {}
+    # (Each training worker builds its own copy.)
+    env = FrozenLakeEnv(config)
 
     # =================================================
-    # Train Monte Carlo
+    # Train the selected algorithms
     # =================================================
-    print("Training Monte Carlo Control...")
-    start = time.time()  # record start time
-
-    # Train and receive:
-    #   Q_mc        → learned Q-table
-    #   mc_metrics  → reward, steps, success history
-    Q_mc, mc_metrics = monte_carlo_control(env)
+    # The algorithms run concurrently, one process each.
+    # Every job returns:
+    #   Q       → learned Q-table
+    #   metrics → reward, steps, success history
+    #   time    → training time measured inside the worker
+    print(f"Training {', '.join(names)}...")
+    results = run_jobs(
+        names, seeds=[args.seed], processes=args.processes, config=config
+    )
 
-    mc_time = time.time() - start  # compute training time
-    q_tables["Monte Carlo"] = Q_mc  # store learned Q-table
-
-    # =================================================
-    # Train SARSA
-    # =================================================
-    print("Training SARSA...")
-    start = time.time()
-
-    Q_sarsa, sarsa_metrics = sarsa(env)
-
-    sarsa_time = time.time() - start
-    q_tables["SARSA"] = Q_sarsa
-
-    # =================================================
-    # Train Q-learning
-    # =================================================
-    print("Training Q-learning...")
-    start = time.time()
-
-    Q_ql, ql_metrics = q_learning(env)
-
-    ql_time = time.time() - start
-    q_tables["Q-Learning"] = Q_ql
+    # Dictionary to store learned Q-tables from each algorithm
+    # This allows us to later plot policies for each method.
+    q_tables = {name: results[(name, args.seed)]["Q"] for name in names}
 
     # =================================================
     # Print learned optimal policies
     # =================================================
-    print("Optimal policy from Monte Carlo Control:")
-    print_policy(Q_mc, env)
-
-    print("Optimal policy from SARSA:")
-    print_policy(Q_sarsa, env)
-
-    print("Optimal policy from Q-learning:")
-    print_policy(Q_ql, env)
+    for name in names:
+        print(f"Optimal policy from {name}:")
+        print_policy(q_tables[name], env)
 
     # =================================================
     # Print training time comparison
     # =================================================
     print("\nTraining Time Comparison:")
-    print(f"Monte Carlo time: {mc_time:.3f}s")
-    print(f"SARSA time: {sarsa_time:.3f}s")
-    print(f"Q-learning time: {ql_time:.3f}s")
+    for name in names:
+        print(f"{name} time: {results[(name, args.seed)]['time']:.3f}s")
 
     # Organize metrics into dictionary for plotting
     metrics_dict = {
-        "Monte Carlo": mc_metrics,
-        "SARSA": sarsa_metrics,
-        "Q-Learning": ql_metrics
+        name: results[(name, args.seed)]["metrics"] for name in names
     }
 
+    if args.save_results is not None:
+        save_results(args.save_results, q_tables, metrics_dict)
+        print(f"\nSaved results to {args.save_results}")
+
+    if args.no_plots:
+        return
+
+    # =================================================
+    # Headless: render every figure to files in parallel
+    # =================================================
+    if args.output_dir is not None:
+        from misc import render_figures
+
+        paths = render_figures(metrics_dict, q_tables, env, args.output_dir)
+        print(f"\nSaved {len(paths)} figures to {args.output_dir}")
+        return
+
+    from misc import plot_single_algorithm, plot_policy_path, plot_comparison
+
     # =================================================
     # Plot results for each algorithm individually
     # =================================================
@@ -121,4 +198,4 @@ def main():
 
 # Only execute main() if this file is run directly
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -5,47 +5,117 @@ Key Idea:
 - Learn from complete episodes.
 - Update Q-values after episode ends.
 - No bootstrapping.
+
+Each episode is held in preallocated arrays. After the episode,
+returns are computed in one vectorized pass and all first-visit
+updates are applied together.
 """
 
-from collections import defaultdict
-from config import *
-from misc import epsilon_greedy
+import random
+
+import numpy as np
+
+from action_selection import epsilon_greedy
+from metrics import MetricsRecorder
+from stats import log_progress
+from checkpoint import load_checkpoint
+from qtable import new_qtable
+
+
+def discounted_returns(rewards, powers):
+    """
+    Returns of every time step of one episode:
+
+        G_t = Σ_{k ≥ t} γ^(k-t) r_k
+
+    Every non-zero reward r_k adds r_k γ^(k-t) to the steps t ≤ k,
+    i.e. r_k times the reversed slice powers[k::-1]. No division, so
+    γ = 0 and γ^t underflowing to 0 on long episodes are exact.
+    Cost is O(T) per non-zero reward; in Frozen Lake only the final
+    step of an episode is rewarded.
+
+    Inputs:
+        rewards → rewards r_0 .. r_{T-1}
+        powers  → γ^0 .. γ^{T-1}
+    """
+
+    returns = np.zeros(len(rewards))
+
+    for k in np.flatnonzero(rewards).tolist():
+        returns[:k + 1] += rewards[k] * powers[k::-1]
+
+    return returns
+
+
+def monte_carlo_control(env, seed=None, config=None, metrics=None,
+                        log_every=None, monitor=None, checkpointer=None,
+                        resume_from=None, profiler=None, evaluator=None):
+
+    # Experiment settings (default: the ones the env was built with)
+    if config is None:
+        config = env.config
 
-def monte_carlo_control(env):
+    num_episodes = config.num_episodes
+    max_steps = config.max_steps_per_episode
+    discount, epsilon = config.discount, config.epsilon
+    alpha = config.mc_alpha  # incremental learning rate
 
     # Initialize Q-table:
-    # For every new state encountered,
-    # create a dictionary mapping each action → 0.0
-    Q = defaultdict(lambda: {a: 0.0 for a in ACTIONS})
+    # One row per state, one column per action, all 0.0
+    Q = new_qtable(env, config)
 
-    episode_rewards = []
-    episode_steps = []
-    episode_success = []
+    # Private random stream (reproducible when seed is given)
+    rng = random.Random(seed)
 
-    alpha = 0.01  # incremental learning rate
+    # Per-episode reward / steps / success history
+    if metrics is None:
+        metrics = MetricsRecorder(num_episodes, max_steps=max_steps)
+
+    # Continue from a saved checkpoint
+    start = 0
+    if resume_from is not None:
+        Q, start = load_checkpoint(resume_from, metrics, rng, Q)
+
+    # Episode buffer, reused for every episode
+    ep_states = np.zeros(max_steps, dtype=np.int64)
+    ep_actions = np.zeros(max_steps, dtype=np.int64)
+    ep_rewards = np.zeros(max_steps, dtype=np.float64)
+
+    # γ^t for t = 0 .. max_steps - 1
+    powers = discount ** np.arange(max_steps, dtype=np.float64)
+
+    # Swapped for timed versions on profiled episodes
+    select, step_index = epsilon_greedy, env.step_index
 
     # ==========================================
     # Main training loop over episodes
     # ==========================================
-    for episode in range(NUM_EPISODES):
+    for episode in range(start, num_episodes):
+
+        if profiler is not None:
+            select, step_index = profiler.start(
+                ("action_selection", epsilon_greedy),
+                ("env_step", env.step_index),
+            )
 
-        episode_data = []  # will store (state, action, reward)
         state = env.reset()
         total_reward = 0
 
         # --------------------------------------
         # Generate one full episode
         # --------------------------------------
-        for step in range(MAX_STEPS_PER_EPISODE):
+        for step in range(max_steps):
 
             # Choose action via epsilon-greedy
-            action = epsilon_greedy(Q, state, EPSILON)
+            action = select(Q, state, epsilon, rng)
 
             # Take action in environment
-            next_state, reward, done = env.step(action)
+            next_state, reward, done = step_index(state, action)
 
             # Store transition
-            episode_data.append((state, action, reward))
+            ep_states[step] = state
+            ep_actions[step] = action
+            ep_rewards[step] = reward
 
             total_reward += reward
             state = next_state
@@ -53,33 +123,60 @@ def monte_carlo_control(env):
             if done:
                 break
 
+        T = step + 1
+
+        # Storing the episode counts as bookkeeping
+        if profiler is not None:
+            profiler.mark("bookkeeping")
+
         # --------------------------------------
-        # Backward return computation
+        # Vectorized return computation
         # --------------------------------------
-        G = 0
-        visited = set()
+        G = discounted_returns(ep_rewards[:T], powers[:T])
+
+        # First visit of every (state, action) pair:
+        # np.unique returns the index of each key's first occurrence
+        keys = ep_states[:T] * Q.n_actions + ep_actions[:T]
+        _, first = np.unique(keys, return_index=True)
+
+        # Incremental MC update, all pairs at once (keys are unique)
+        s, a = ep_states[first], ep_actions[first]
+        Q.add(s, a, alpha * (G[first] - Q.gather(s, a)))
+
+        if profiler is not None:
+            profiler.mark("q_update")
+
+        metrics.record(
+            total_reward, T, 1 if total_reward > 0 else 0
+        )
+
+        if log_every:
+            log_progress("Monte Carlo", metrics, log_every, metrics.count - 1)
+
+        # Early stopping once the monitor reports convergence
+        if monitor is not None and monitor.update(Q, metrics.count):
+            break
+
+        if checkpointer is not None:
+            checkpointer.update(Q, metrics, rng)
 
-        # Loop backward through episode
-        for state, action, reward in reversed(episode_data):
+        # Greedy-policy evaluation every K episodes
+        if evaluator is not None:
+            evaluator.update(Q, metrics.count)
 
-            # Compute return
-            G = DISCOUNT * G + reward
+        if profiler is not None:
+            profiler.mark("bookkeeping")
 
-            # First-visit condition
-            if (state, action) not in visited:
-                visited.add((state, action))
+    if monitor is not None:
+        metrics.meta["converged_episode"] = monitor.converged_at
 
-                # Incremental MC update
-                Q[state][action] += alpha * (G - Q[state][action])
+    if profiler is not None:
+        metrics.meta["profile"] = profiler.report()
 
-        episode_rewards.append(total_reward)
-        episode_steps.append(len(episode_data))
-        episode_success.append(1 if total_reward > 0 else 0)
+    if evaluator is not None:
+        metrics.meta["evaluation"] = evaluator.history
 
-    metrics = {
-        "rewards": episode_rewards,
-        "steps": episode_steps,
-        "success": episode_success
-    }
+    if checkpointer is not None:
+        checkpointer.save(Q, metrics, rng)
 
     return Q, metrics
\ No newline at end of file
@@ -0,0 +1,246 @@
+"""
+metrics.py
+
+Compact per-episode training metrics.
+
+Every learner records one (reward, steps, success) triple per episode.
+MetricsRecorder keeps them in preallocated typed NumPy arrays:
+
+    rewards → int8
+    steps   → int16 (int32 if MAX_STEPS_PER_EPISODE does not fit)
+    success → int8
+
+It behaves like the old metrics dictionary:
+
+    metrics["rewards"], metrics["steps"], metrics["success"]
+
+each returning a view of the recorded part of the array (no copy).
+
+A RunningStats object (stats.py) is updated alongside, so windowed
+means and accuracy are available at any time during training.
+"""
+
+import os
+from collections.abc import Mapping
+
+import numpy as np
+
+from config import NUM_EPISODES, MAX_STEPS_PER_EPISODE
+from stats import RunningStats
+
+# Names of the recorded series
+FIELDS = ("rewards", "steps", "success")
+
+
+def steps_dtype(max_steps):
+    """
+    Smallest integer type able to hold an episode length.
+    """
+    return np.int16 if max_steps <= np.iinfo(np.int16).max else np.int32
+
+
+class MetricsRecorder(Mapping):
+    """
+    Growable typed arrays of per-episode metrics.
+    """
+
+    def __init__(self, capacity=NUM_EPISODES, chunk_size=65536,
+                 spill_dir=None, max_steps=MAX_STEPS_PER_EPISODE,
+                 window=500, keep_history=True):
+        """
+        Inputs:
+            capacity   → number of episodes to preallocate for
+            chunk_size → extra episodes added whenever capacity runs out
+            spill_dir  → if given, store the arrays as memory-mapped
+                         files in this directory instead of in RAM
+            max_steps  → longest possible episode (picks the steps type)
+            window     → moving-average window of the running stats
+                         (None = no running stats)
+            keep_history → False keeps only the running stats and the
+                           episode count, not the per-episode arrays
+        """
+
+        self.keep_history = keep_history
+        self.stats = RunningStats(window) if window else None
+
+        if not keep_history:
+            capacity = 0
+
+        self.capacity = max(int(capacity), 1)
+        self.chunk_size = max(int(chunk_size), 1)
+        self.spill_dir = spill_dir
+        self.count = 0
+
+        # Extra results attached by learners (e.g. convergence episode)
+        self.meta = {}
+
+        self._dtypes = {
+            "rewards": np.int8,
+            "steps": steps_dtype(max_steps),
+            "success": np.int8,
+        }
+
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+
+        self._arrays = {
+            name: self._allocate(name, self.capacity) for name in FIELDS
+        }
+
+    # --------------------------------------------------
+    # Storage
+    # --------------------------------------------------
+
+    def _path(self, name):
+        return os.path.join(self.spill_dir, f"{name}.bin")
+
+    def _allocate(self, name, capacity, old=None):
+        """
+        Create (or enlarge) the array for one field.
+        """
+
+        dtype = self._dtypes[name]
+
+        if self.spill_dir is None:
+            array = np.zeros(capacity, dtype=dtype)
+            if old is not None:
+                array[:len(old)] = old
+            return array
+
+        # Memory-mapped: grow the backing file, then remap it
+        path = self._path(name)
+        if old is not None:
+            old.flush()
+            del old
+        with open(path, "ab") as f:
+            f.truncate(capacity * np.dtype(dtype).itemsize)
+
+        return np.memmap(path, dtype=dtype, mode="r+", shape=(capacity,))
+
+    def _grow(self, needed):
+        """
+        Add whole chunks until at least `needed` episodes fit.
+        """
+
+        extra = needed - self.capacity
+        chunks = -(-extra // self.chunk_size)
+        self.capacity += chunks * self.chunk_size
+
+        for name in FIELDS:
+            self._arrays[name] = self._allocate(
+                name, self.capacity, self._arrays[name]
+            )
+
+    # --------------------------------------------------
+    # Recording
+    # --------------------------------------------------
+
+    def record(self, reward, steps, success):
+        """
+        Record one finished episode.
+        """
+
+        if self.stats is not None:
+            self.stats.update(reward, steps, success)
+
+        i = self.count
+        if not self.keep_history:
+            self.count = i + 1
+            return
+
+        if i == self.capacity:
+            self._grow(i + 1)
+
+        arrays = self._arrays
+        arrays["rewards"][i] = reward
+        arrays["steps"][i] = steps
+        arrays["success"][i] = success
+
+        self.count = i + 1
+
+    def record_batch(self, rewards, steps, success):
+        """
+        Record several finished episodes at once (array inputs).
+        """
+
+        if self.stats is not None:
+            self.stats.update_batch(rewards, steps, success)
+
+        n = len(rewards)
+        end = self.count + n
+        if not self.keep_history:
+            self.count = end
+            return
+
+        if end > self.capacity:
+            self._grow(end)
+
+        arrays = self._arrays
+        arrays["rewards"][self.count:end] = rewards
+        arrays["steps"][self.count:end] = steps
+        arrays["success"][self.count:end] = success
+
+        self.count = end
+
+    def truncate(self, count):
+        """
+        Forget every episode after the first `count`.
+        """
+        self.count = min(self.count, count)
+
+    def flush(self):
+        """
+        Write memory-mapped arrays to disk (no-op in RAM).
+        """
+        if self.spill_dir is not None:
+            for array in self._arrays.values():
+                array.flush()
+
+    # --------------------------------------------------
+    # Dict-like read access
+    # --------------------------------------------------
+
+    def __getitem__(self, name):
+        if not self.keep_history:
+            return self._arrays[name][:0]
+        return self._arrays[name][:self.count]
+
+    def __iter__(self):
+        return iter(FIELDS)
+
+    def __len__(self):
+        return len(FIELDS)
+
+    # --------------------------------------------------
+    # Pickling (only the recorded part, always in RAM)
+    # --------------------------------------------------
+
+    @classmethod
+    def from_arrays(cls, rewards, steps, success, meta=None, stats=None,
+                    count=None, keep_history=True):
+        """
+        Build an in-memory recorder from existing arrays.
+
+        A history-free recorder (keep_history=False) has empty arrays,
+        so its episode count is passed separately as count.
+        """
+
+        recorder = cls(capacity=len(rewards), window=None,
+                       keep_history=keep_history)
+        recorder._dtypes["steps"] = np.asarray(steps).dtype
+        recorder._arrays["steps"] = np.zeros(
+            recorder.capacity, dtype=recorder._dtypes["steps"]
+        )
+        recorder.record_batch(rewards, steps, success)
+        if count is not None:
+            recorder.count = count
+        recorder.meta = dict(meta or {})
+        recorder.stats = stats
+        return recorder
+
+    def __reduce__(self):
+        return (
+            MetricsRecorder.from_arrays,
+            (*(np.array(self[name]) for name in FIELDS),
+             self.meta, self.stats, self.count, self.keep_history),
+        )
@@ -2,22 +2,23 @@
 misc.py
 
 Utility functions for:
-- Action selection (epsilon-greedy)
+- Action selection (epsilon-greedy, see action_selection.py)
 - Printing learned policies
-- Plotting learning curves
-- Comparing algorithms
-- Visualizing learned policy paths
+- Smoothing and downsampling learning curves
+
+The plotting functions live in plotting.py, which imports matplotlib.
+They can still be imported from here ("from misc import plot_comparison"),
+but matplotlib is only loaded when one of them is first used, so
+training code that imports misc does not pay for it.
 
 This file does NOT contain learning logic.
 It only supports training and visualization.
 """
 
-import matplotlib.pyplot as plt
 import numpy as np
-import random
 
-# Import required configuration variables
-from config import ACTIONS, ACTION_TO_DELTA, GRID_ROWS, GRID_COLS, HOLES, GOAL_STATE
+from config import ACTIONS
+from policy import greedy_policy
 
 
 # ============================================================
@@ -36,62 +37,9 @@ arrow_map = {
 # 1. Epsilon-Greedy Action Selection
 # ============================================================
 
-def epsilon_greedy(Q, state, epsilon):
-    """
-    Select an action using textbook epsilon-greedy policy.
-
-    With probability (1 - epsilon):
-        Choose the greedy (best) action.
-
-    With probability epsilon:
-        Choose randomly among all actions.
-
-    Implementation detail:
-        Greedy action probability = 1 - epsilon + epsilon/|A|
-        Other actions probability = epsilon/|A|
-
-    Inputs:
-        Q       → Q-table dictionary
-        state   → integer state index
-        epsilon → exploration probability
-
-    Returns:
-        action (string)
-    """
-
-    # Retrieve dictionary of action-values for this state
-    # Example: Q[state] = {'UP': 0.3, 'DOWN': -0.1, ...}
-    q_values = Q[state]
-
-    # Find maximum Q-value among all actions
-    max_q = max(q_values.values())
-
-    # There may be ties for maximum Q-value.
-    # Collect all actions that share the maximum value.
-    greedy_actions = [
-        action for action, value in q_values.items()
-        if value == max_q
-    ]
-
-    # If multiple greedy actions exist, choose randomly among them
-    greedy_action = random.choice(greedy_actions)
-
-    num_actions = len(ACTIONS)
-
-    # Build probability distribution over actions
-    probs = []
-
-    for action in ACTIONS:
-
-        if action == greedy_action:
-            # Greedy action gets majority probability mass
-            probs.append(1 - epsilon + epsilon / num_actions)
-        else:
-            # All other actions share exploration probability
-            probs.append(epsilon / num_actions)
-
-    # Randomly sample according to probability weights
-    return random.choices(ACTIONS, weights=probs, k=1)[0]
+# Implemented in action_selection.py; re-exported here so existing
+# "from misc import epsilon_greedy" imports keep working.
+from action_selection import epsilon_greedy, epsilon_greedy_batch
 
 
 # ============================================================
@@ -106,310 +54,85 @@ def print_policy(Q, env):
         - G for goal
         - H for hole
         - Arrow for best action
-    """
-
-    for r in range(GRID_ROWS):
-
-        row = []
-
-        for c in range(GRID_COLS):
+        - · for states not learned yet (all Q-values still zero,
+          so there is no best action to show)
 
-            state = (r, c)
-
-            # If goal state
-            if state == GOAL_STATE:
-                row.append(' G ')
-
-            # If hole
-            elif state in HOLES:
-                row.append(' H ')
-
-            else:
-                # Convert (r,c) to state index
-                s_idx = env.state_to_index(state)
+    The greedy actions come from the cached policy of Q
+    (policy.greedy_policy), computed once per Q-table version.
+    """
 
-                # Select action with highest Q-value
-                best_action = max(Q[s_idx], key=Q[s_idx].get)
+    policy = greedy_policy(Q, env)
+    actions = policy.actions.reshape(env.rows, env.cols)
 
-                row.append(f' {arrow_map[best_action]} ')
+    # One cell string per action id, then unlearned states,
+    # holes and goal on top
+    cells = np.array([f' {arrow_map[a]} ' for a in ACTIONS])[actions]
+    cells[~policy.learned.reshape(env.rows, env.cols)] = ' · '
+    cells[env.hole_mask] = ' H '
+    cells[env.goal_state] = ' G '
 
-        # Print full row as continuous string
+    # Print each row as continuous string
+    for row in cells:
         print(''.join(row))
 
     print()  # blank line after grid
 
 
 # ============================================================
-# 3. Moving Average (Smoothing)
+# 3. Smoothing and Downsampling
 # ============================================================
 
 def moving_average(data, window=500):
     """
-    Smooth noisy learning curves using convolution.
+    Smooth noisy learning curves with a sliding-window mean.
 
     window = number of episodes to average over.
 
     This helps visualize overall trend instead of noisy spikes.
+    Uses a running sum, so the cost is O(N) regardless of window
+    (same output as np.convolve(..., mode='valid')).
     """
-    return np.convolve(data, np.ones(window)/window, mode='valid')
+    csum = np.cumsum(data, dtype=np.float64)
+    csum = np.concatenate(([0.0], csum))
+    return (csum[window:] - csum[:-window]) / window
 
 
-# ============================================================
-# 4. Plot Single Algorithm Performance
-# ============================================================
-
-def plot_single_algorithm(metrics, algo_name):
-    """
-    Plot:
-    - Average reward
-    - Average steps
-    - Success rate
-    - Success vs failure bar chart
-
-    metrics is a dictionary:
-        {
-            "rewards": [...],
-            "steps": [...],
-            "success": [...]
-        }
+def downsample(data, max_points=2000):
     """
+    Thin a long curve to at most max_points evenly spaced points.
 
-    rewards = metrics["rewards"]
-    steps = metrics["steps"]
-    success = metrics["success"]
-
-    # Compute cumulative success rate:
-    # accuracy[i] = (# successes up to episode i) / i
-    acc = np.cumsum(success) / np.arange(1, len(success) + 1)
-
-    # Create 2x2 subplot layout
-    fig, axs = plt.subplots(2, 2, figsize=(12, 8))
-    fig.suptitle(f"{algo_name} Performance")
-
-    # ------------------------------------------
-    # Reward Curve
-    # ------------------------------------------
-    axs[0, 0].plot(moving_average(rewards))
-    axs[0, 0].set_title("Average Reward")
-
-    # ------------------------------------------
-    # Steps Curve
-    # ------------------------------------------
-    axs[0, 1].plot(moving_average(steps))
-    axs[0, 1].set_title("Average Steps")
-
-    # ------------------------------------------
-    # Accuracy Curve
-    # ------------------------------------------
-    axs[1, 0].plot(acc)
-    axs[1, 0].set_title("Accuracy (Success Rate)")
-
-    # ------------------------------------------
-    # Success vs Failure Bar Chart
-    # ------------------------------------------
-
-    total_success = sum(success)
-    total_fail = len(success) - total_success
-
-    axs[1, 1].bar(
-        ["Success", "Failure"],
-        [total_success, total_fail],
-        color=['tab:blue', 'red'],
-        edgecolor='black'
-    )
+    Returns (x, y) so the x-axis still shows the original index.
+    Long runs produce curves with 250k+ points, which are slow
+    to draw and give huge files without looking any different.
+    """
 
-    axs[1, 1].set_title("Success vs Failure")
+    data = np.asarray(data)
+    if len(data) <= max_points:
+        return np.arange(len(data)), data
 
-    plt.tight_layout()
-    plt.show()
+    x = np.linspace(0, len(data) - 1, max_points).astype(np.int64)
+    return x, data[x]
 
 
 # ============================================================
-# 5. Plot Comparison Between Algorithms
+# 4. Plotting (lazy import of plotting.py)
 # ============================================================
 
-def plot_comparison(metrics_dict):
-    """
-    Compare multiple algorithms on same figure.
-
-    metrics_dict example:
-    {
-        "Monte Carlo": mc_metrics,
-        "SARSA": sarsa_metrics,
-        "Q-Learning": ql_metrics
-    }
-    """
-
-    fig, axs = plt.subplots(2, 2, figsize=(14, 10))
-    fig.suptitle("Algorithm Comparison")
-
-    # ------------------------------------------
-    # Plot curves for each algorithm
-    # ------------------------------------------
-
-    for name, metrics in metrics_dict.items():
-
-        rewards = metrics["rewards"]
-        steps = metrics["steps"]
-        success = metrics["success"]
-
-        acc = np.cumsum(success) / np.arange(1, len(success) + 1)
-
-        axs[0, 0].plot(moving_average(rewards), label=name)
-        axs[0, 1].plot(moving_average(steps), label=name)
-        axs[1, 0].plot(acc, label=name)
-
-    axs[0, 0].set_title("Average Reward")
-    axs[0, 1].set_title("Average Steps")
-    axs[1, 0].set_title("Accuracy")
-
-    axs[0, 0].legend()
-    axs[0, 1].legend()
-    axs[1, 0].legend()
-
-    # ------------------------------------------
-    # Success Comparison Bars
-    # ------------------------------------------
-
-    labels = list(metrics_dict.keys())
-
-    success_counts = []
-    fail_counts = []
-
-    for metrics in metrics_dict.values():
-        s = sum(metrics["success"])
-        f = len(metrics["success"]) - s
-        success_counts.append(s)
-        fail_counts.append(f)
-
-    x = np.arange(len(labels))
-    width = 0.35
-
-    axs[1, 1].bar(
-        x - width/2, success_counts, width,
-        label="Success", color='tab:blue', edgecolor='black'
-    )
-
-    axs[1, 1].bar(
-        x + width/2, fail_counts, width,
-        label="Failure", color='red', edgecolor='black'
-    )
-
-    axs[1, 1].set_xticks(x)
-    axs[1, 1].set_xticklabels(labels)
-    axs[1, 1].set_title("Success vs Failure Comparison")
-    axs[1, 1].legend()
-
-    plt.tight_layout()
-    plt.show()
-
+_PLOTTING_NAMES = {
+    "plot_single_algorithm",
+    "plot_comparison",
+    "plot_policy_path",
+    "render_figures",
+}
 
-# ============================================================
-# 6. Plot Policy Path Visualization
-# ============================================================
 
-def plot_policy_path(Q, env, grid_size, algo_name):
+def __getattr__(name):
     """
-    Visualize:
-    - Grid layout
-    - Greedy policy arrows
-    - Path followed from start to goal
+    Load plotting.py (and matplotlib) on first access of a plot function.
     """
 
-    plt.figure(figsize=(6, 6))
-    plt.title(f"{algo_name} Policy & Path")
-
-    # --------------------------------------------------
-    # Follow greedy policy starting from start state
-    # --------------------------------------------------
-
-    state = env.start_state
-    path = [state]   # store visited states
-    visited = set()  # detect loops
-
-    while state != env.goal_state:
-
-        s_idx = env.state_to_index(state)
-
-        # If state not learned yet → stop
-        if s_idx not in Q:
-            break
-
-        # If loop detected → stop
-        if state in visited:
-            break
-
-        visited.add(state)
-
-        # Choose greedy action
-        best_action = max(Q[s_idx], key=Q[s_idx].get)
-
-        # Convert action into movement
-        dr, dc = ACTION_TO_DELTA[best_action]
-        next_state = (state[0] + dr, state[1] + dc)
-
-        # Stop if invalid move or hole
-        if (next_state[0] < 0 or next_state[0] >= grid_size or
-            next_state[1] < 0 or next_state[1] >= grid_size or
-            next_state in env.holes):
-            break
-
-        path.append(next_state)
-        state = next_state
-
-    # --------------------------------------------------
-    # Draw Grid
-    # --------------------------------------------------
-
-    for r in range(grid_size):
-        for c in range(grid_size):
-
-            tile = env.grid[r][c]
-            color = 'white'
-
-            if tile == 'H':
-                color = 'black'
-            elif tile == 'G':
-                color = 'green'
-            elif tile == 'S':
-                color = 'blue'
-
-            # Highlight path
-            if (r, c) in path and (r, c) not in [env.start_state, env.goal_state]:
-                color = '#fff5b1'
-
-            plt.gca().add_patch(
-                plt.Rectangle((c, r), 1, 1, color=color, ec='gray')
-            )
-
-    # --------------------------------------------------
-    # Draw Policy Arrows
-    # --------------------------------------------------
-
-    for r in range(grid_size):
-        for c in range(grid_size):
-
-            s_idx = env.state_to_index((r, c))
-
-            if (s_idx in Q and
-                (r, c) not in env.holes and
-                (r, c) != env.goal_state):
-
-                best_action = max(Q[s_idx], key=Q[s_idx].get)
-
-                plt.text(
-                    c + 0.5, r + 0.5,
-                    arrow_map[best_action],
-                    ha='center', va='center',
-                    fontsize=16, color='red'
-                )
+    if name in _PLOTTING_NAMES:
+        import plotting
+        return getattr(plotting, name)
 
-    # Formatting
-    plt.xlim(0, grid_size)
-    plt.ylim(0, grid_size)
-    plt.gca().invert_yaxis()
-    plt.gca().set_aspect('equal')
-    plt.xticks(range(grid_size + 1))
-    plt.yticks(range(grid_size + 1))
-    plt.grid(which='major')
-    plt.show()
\ No newline at end of file
+    raise AttributeError(f"module 'misc' has no attribute {name!r}")
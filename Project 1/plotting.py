@@ -0,0 +1,375 @@
+"""
+plotting.py
+
+Plotting functions (matplotlib) for:
+- Learning curves of a single algorithm
+- Comparing algorithms
+- Visualizing learned policy paths
+- Rendering every figure to files (headless, optionally in parallel)
+
+Every plot function shows its figure interactively by default,
+or writes it to save_path (and closes it) when one is given.
+
+Imported lazily through misc, so training code never loads matplotlib.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.colors import ListedColormap
+
+from config import ACTIONS, ACTION_TO_DELTA
+from misc import moving_average, downsample
+from policy import greedy_policy
+
+# Tile colors of plot_policy_path: frozen, hole, path, start, goal
+_TILE_COLORS = ListedColormap(["white", "black", "#fff5b1", "blue", "green"])
+
+
+def _finish(fig, save_path):
+    """
+    Show the figure, or write it to save_path and close it.
+    """
+
+    if save_path is None:
+        plt.show()
+    else:
+        fig.savefig(save_path, dpi=120)
+        plt.close(fig)
+
+
+# ============================================================
+# 1. Plot Single Algorithm Performance
+# ============================================================
+
+def plot_single_algorithm(metrics, algo_name, save_path=None):
+    """
+    Plot:
+    - Average reward
+    - Average steps
+    - Success rate
+    - Success vs failure bar chart
+
+    metrics is a MetricsRecorder (or any dictionary):
+        {
+            "rewards": [...],
+            "steps": [...],
+            "success": [...]
+        }
+    """
+
+    rewards = metrics["rewards"]
+    steps = metrics["steps"]
+    success = metrics["success"]
+
+    # Compute cumulative success rate:
+    # accuracy[i] = (# successes up to episode i) / i
+    acc = np.cumsum(success) / np.arange(1, len(success) + 1)
+
+    # Create 2x2 subplot layout
+    fig, axs = plt.subplots(2, 2, figsize=(12, 8))
+    fig.suptitle(f"{algo_name} Performance")
+
+    # ------------------------------------------
+    # Reward Curve
+    # ------------------------------------------
+    axs[0, 0].plot(*downsample(moving_average(rewards)))
+    axs[0, 0].set_title("Average Reward")
+
+    # ------------------------------------------
+    # Steps Curve
+    # ------------------------------------------
+    axs[0, 1].plot(*downsample(moving_average(steps)))
+    axs[0, 1].set_title("Average Steps")
+
+    # ------------------------------------------
+    # Accuracy Curve
+    # ------------------------------------------
+    axs[1, 0].plot(*downsample(acc))
+    axs[1, 0].set_title("Accuracy (Success Rate)")
+
+    # ------------------------------------------
+    # Success vs Failure Bar Chart
+    # ------------------------------------------
+
+    total_success = int(np.sum(success))
+    total_fail = len(success) - total_success
+
+    axs[1, 1].bar(
+        ["Success", "Failure"],
+        [total_success, total_fail],
+        color=['tab:blue', 'red'],
+        edgecolor='black'
+    )
+
+    axs[1, 1].set_title("Success vs Failure")
+
+    plt.tight_layout()
+    _finish(fig, save_path)
+
+
+# ============================================================
+# 2. Plot Comparison Between Algorithms
+# ============================================================
+
+def plot_comparison(metrics_dict, save_path=None):
+    """
+    Compare multiple algorithms on same figure.
+
+    metrics_dict example:
+    {
+        "Monte Carlo": mc_metrics,
+        "SARSA": sarsa_metrics,
+        "Q-Learning": ql_metrics
+    }
+    """
+
+    fig, axs = plt.subplots(2, 2, figsize=(14, 10))
+    fig.suptitle("Algorithm Comparison")
+
+    # ------------------------------------------
+    # Plot curves for each algorithm
+    # ------------------------------------------
+
+    for name, metrics in metrics_dict.items():
+
+        rewards = metrics["rewards"]
+        steps = metrics["steps"]
+        success = metrics["success"]
+
+        acc = np.cumsum(success) / np.arange(1, len(success) + 1)
+
+        axs[0, 0].plot(*downsample(moving_average(rewards)), label=name)
+        axs[0, 1].plot(*downsample(moving_average(steps)), label=name)
+        axs[1, 0].plot(*downsample(acc), label=name)
+
+    axs[0, 0].set_title("Average Reward")
+    axs[0, 1].set_title("Average Steps")
+    axs[1, 0].set_title("Accuracy")
+
+    axs[0, 0].legend()
+    axs[0, 1].legend()
+    axs[1, 0].legend()
+
+    # ------------------------------------------
+    # Success Comparison Bars
+    # ------------------------------------------
+
+    labels = list(metrics_dict.keys())
+
+    success_counts = []
+    fail_counts = []
+
+    for metrics in metrics_dict.values():
+        s = int(np.sum(metrics["success"]))
+        f = len(metrics["success"]) - s
+        success_counts.append(s)
+        fail_counts.append(f)
+
+    x = np.arange(len(labels))
+    width = 0.35
+
+    axs[1, 1].bar(
+        x - width/2, success_counts, width,
+        label="Success", color='tab:blue', edgecolor='black'
+    )
+
+    axs[1, 1].bar(
+        x + width/2, fail_counts, width,
+        label="Failure", color='red', edgecolor='black'
+    )
+
+    axs[1, 1].set_xticks(x)
+    axs[1, 1].set_xticklabels(labels)
+    axs[1, 1].set_title("Success vs Failure Comparison")
+    axs[1, 1].legend()
+
+    plt.tight_layout()
+    _finish(fig, save_path)
+
+
+# ============================================================
+# 3. Plot Policy Path Visualization
+# ============================================================
+
+def plot_policy_path(Q, env, grid_size, algo_name, save_path=None,
+                     max_arrows=2500):
+    """
+    Visualize:
+    - Grid layout
+    - Greedy policy arrows
+    - Path followed from start to goal
+
+    The tiles are drawn as one image and the arrows as one quiver
+    layer, so the cost barely depends on the grid size.
+
+    Inputs:
+        Q          → QTable
+        env        → FrozenLakeEnv (its rows x cols set the grid shape)
+        grid_size  → unused, kept for old callers
+        algo_name  → title prefix
+        save_path  → file to write instead of showing the figure
+        max_arrows → at most about this many arrows are drawn; larger
+                     grids show the arrow of every k-th row and column
+    """
+
+    rows, cols = env.rows, env.cols
+
+    # Figure keeps the grid's aspect ratio (longest side 6 inches)
+    scale = 6 / max(rows, cols)
+    fig, ax = plt.subplots(
+        figsize=(max(cols * scale, 3), max(rows * scale, 3))
+    )
+    ax.set_title(f"{algo_name} Policy & Path")
+
+    # --------------------------------------------------
+    # Greedy policy and its path from the start state
+    # (computed once per Q-table version, see policy.py)
+    # --------------------------------------------------
+
+    policy = greedy_policy(Q, env)
+    path = np.array(policy.path)
+
+    # --------------------------------------------------
+    # Draw Grid: one image, one color code per cell
+    # --------------------------------------------------
+
+    tiles = np.zeros((rows, cols), dtype=np.int8)   # frozen
+    tiles[env.hole_mask] = 1                        # hole
+    tiles[path[:, 0], path[:, 1]] = 2               # path
+    tiles[env.start_state] = 3                      # start
+    tiles[env.goal_state] = 4                       # goal
+
+    ax.imshow(
+        tiles, cmap=_TILE_COLORS, vmin=0, vmax=len(_TILE_COLORS.colors) - 1,
+        extent=(0, cols, rows, 0), interpolation="nearest"
+    )
+
+    # Cells too small to see the path: draw it as a line as well
+    if max(rows, cols) > 50 and len(path) > 1:
+        ax.plot(path[:, 1] + 0.5, path[:, 0] + 0.5, color="orange", lw=1)
+
+    # --------------------------------------------------
+    # Draw Policy Arrows: one quiver layer
+    # --------------------------------------------------
+
+    # Every k-th row and column when there are too many cells
+    step = max(int(np.ceil(np.sqrt(rows * cols / max_arrows))), 1)
+    r, c = np.mgrid[step // 2:rows:step, step // 2:cols:step]
+    r, c = r.ravel(), c.ravel()
+
+    s_idx = r * cols + c
+    show = (policy.learned[s_idx] & ~env.hole_mask[r, c] &
+            (s_idx != env.state_to_index(env.goal_state)))
+    r, c, s_idx = r[show], c[show], s_idx[show]
+
+    # (dr, dc) of each greedy action; the y-axis points down
+    deltas = np.array([ACTION_TO_DELTA[a] for a in ACTIONS])
+    dr, dc = deltas[policy.actions[s_idx]].T
+    length = 0.6 * step
+
+    ax.quiver(
+        c + 0.5, r + 0.5, dc * length, dr * length,
+        angles="xy", scale_units="xy", scale=1, pivot="middle",
+        color="red", width=0.15 / max(max(rows, cols) / step, 10)
+    )
+
+    # Formatting
+    ax.set_xlim(0, cols)
+    ax.set_ylim(rows, 0)
+    ax.set_aspect("equal")
+
+    # Cell borders only where they are visible
+    if max(rows, cols) <= 50:
+        ax.set_xticks(range(cols + 1))
+        ax.set_yticks(range(rows + 1))
+        ax.grid(which="major", color="gray")
+
+    _finish(fig, save_path)
+
+
+# ============================================================
+# 4. Render All Figures to Files
+# ============================================================
+
+def _slug(name):
+    """
+    File-name friendly version of an algorithm name.
+    """
+    return name.lower().replace(" ", "_").replace("-", "_")
+
+
+def _use_headless_backend():
+    """
+    Switch matplotlib to the non-interactive Agg backend.
+    """
+    plt.switch_backend("Agg")
+
+
+def _render_job(job):
+    """
+    Draw one figure to file (runs inside a worker process).
+    """
+
+    kind, args, save_path = job
+
+    if kind == "single":
+        plot_single_algorithm(*args, save_path=save_path)
+    elif kind == "path":
+        plot_policy_path(*args, save_path=save_path)
+    else:
+        plot_comparison(*args, save_path=save_path)
+
+    return save_path
+
+
+def render_figures(metrics_dict, q_tables, env, out_dir,
+                   processes=None, fmt="png"):
+    """
+    Write every figure main.py would show to out_dir, without a display.
+
+    For each algorithm:
+        <name>_performance.<fmt>  → learning curves
+        <name>_policy.<fmt>       → policy arrows and greedy path
+    Plus:
+        comparison.<fmt>          → all algorithms together
+
+    Inputs:
+        metrics_dict → {name: metrics}
+        q_tables     → {name: Q}
+        env          → FrozenLakeEnv
+        out_dir      → output directory (created if missing)
+        processes    → worker processes (None = CPU count, 1 = in-process)
+        fmt          → image format understood by matplotlib
+
+    Returns:
+        list of written file paths
+    """
+
+    os.makedirs(out_dir, exist_ok=True)
+
+    jobs = []
+    for name in metrics_dict:
+        slug = _slug(name)
+        jobs.append((
+            "single", (metrics_dict[name], name),
+            os.path.join(out_dir, f"{slug}_performance.{fmt}")
+        ))
+        jobs.append((
+            "path", (q_tables[name], env, env.rows, name),
+            os.path.join(out_dir, f"{slug}_policy.{fmt}")
+        ))
+    jobs.append((
+        "comparison", (metrics_dict,),
+        os.path.join(out_dir, f"comparison.{fmt}")
+    ))
+
+    if processes == 1:
+        _use_headless_backend()
+        return [_render_job(job) for job in jobs]
+
+    with ProcessPoolExecutor(max_workers=processes,
+                             initializer=_use_headless_backend) as pool:
+        return list(pool.map(_render_job, jobs))
\ No newline at end of file
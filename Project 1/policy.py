@@ -0,0 +1,148 @@
+"""
+policy.py
+
+Greedy policy extracted from a Q-table in one pass.
+
+GreedyPolicy computes, with a single argmax / max over the state
+axis, and caches:
+
+    actions      → greedy action id of every state
+    learned      → True for states with any non-zero Q-value
+    state_values → V(s) = max_a Q(s, a) as a (rows, cols) map
+    path         → cells visited following the greedy policy
+                   from the start state (see trace below)
+
+The caches are dropped only when Q.version changes, i.e. after
+the table was updated. greedy_policy(Q, env) returns the same
+GreedyPolicy object for repeated calls with the same table and
+environment, so printing and plotting share one computation.
+"""
+
+import weakref
+
+from config import ACTIONS, ACTION_TO_DELTA
+
+# (dr, dc) of every action id
+_DELTAS = [ACTION_TO_DELTA[a] for a in ACTIONS]
+
+
+class GreedyPolicy:
+    """
+    Cached greedy policy of one Q-table on one environment.
+    """
+
+    def __init__(self, Q, env):
+        self.Q = Q
+        self.env = env
+        self._version = None
+
+    def _refresh(self):
+        """
+        Recompute actions and values if the Q-table changed.
+        """
+
+        if self._version == self.Q.version:
+            return
+
+        values = self.Q.values
+
+        self._actions = values.argmax(axis=1)
+        self._max = values.max(axis=1)
+        self._learned = values.any(axis=1)
+        self._path = None
+
+        self._version = self.Q.version
+
+    # --------------------------------------------------
+    # Cached results
+    # --------------------------------------------------
+
+    @property
+    def actions(self):
+        """
+        Greedy action id of every state (first best on ties,
+        matching max(Q[s], key=Q[s].get)).
+        """
+        self._refresh()
+        return self._actions
+
+    @property
+    def learned(self):
+        """
+        True for states with any non-zero Q-value.
+        """
+        self._refresh()
+        return self._learned
+
+    @property
+    def state_values(self):
+        """
+        V(s) = max_a Q(s, a) as a (rows, cols) array.
+        """
+        self._refresh()
+        return self._max.reshape(self.env.rows, self.env.cols)
+
+    @property
+    def path(self):
+        """
+        List of (row, col) cells on the greedy path from the start.
+        """
+        self._refresh()
+        if self._path is None:
+            self._path = self._trace()
+        return self._path
+
+    def _trace(self):
+        """
+        Follow the greedy policy from the start state.
+
+        Stops at the goal, at a state that was never learned,
+        on a loop, or before stepping off the grid or into a hole.
+        """
+
+        env = self.env
+        rows, cols = env.rows, env.cols
+        actions = self._actions
+        learned = self._learned
+        holes = env.hole_mask
+
+        state = env.start_state
+        goal = env.goal_state
+        path = [state]
+        visited = set()
+
+        while state != goal:
+
+            s_idx = state[0] * cols + state[1]
+
+            if not learned[s_idx] or state in visited:
+                break
+            visited.add(state)
+
+            dr, dc = _DELTAS[actions[s_idx]]
+            r, c = state[0] + dr, state[1] + dc
+
+            if not (0 <= r < rows and 0 <= c < cols) or holes[r, c]:
+                break
+
+            state = (r, c)
+            path.append(state)
+
+        return path
+
+
+# Q-table → its most recent GreedyPolicy (dropped with the table)
+_CACHE = weakref.WeakKeyDictionary()
+
+
+def greedy_policy(Q, env):
+    """
+    Cached GreedyPolicy of Q on env.
+    """
+
+    policy = _CACHE.get(Q)
+    if policy is None or policy.env is not env:
+        policy = GreedyPolicy(Q, env)
+        _CACHE[Q] = policy
+
+    return policy
@@ -0,0 +1,255 @@
+"""
+Prioritized Sweeping (model-based planning ordered by Bellman error)
+
+Every real transition is stored in a model (as in dyna_q.py).
+Instead of replaying random pairs, planning always backs up the
+(state, action) pair whose value is most out of date:
+
+priority(s,a) = | r + γ max_a' Q(s',a') - Q(s,a) |
+
+1. After each real step, (s, a) is queued with its priority.
+2. Up to config.planning_steps times per real step, the pair with
+   the highest priority is popped and backed up from the model:
+       Q(s,a) ← Q(s,a) + α [ r + γ max_a' Q(s',a') - Q(s,a) ]
+3. Its value change affects every observed pair (s̄, ā) leading into s.
+   These come from the env's predecessor index (CSR arrays, built
+   once) and are queued if their priority exceeds theta.
+
+The goal reward therefore travels back along the whole path within
+one episode's planning instead of one step per episode.
+
+The queue is a binary heap with lazy deletion: each pair stores its
+current priority, so raising it pushes a new entry and outdated
+entries are skipped when popped.
+
+The model and the priorities are dicts keyed by observed pairs only,
+so their size follows the visited part of the map (as BlockQTable
+does for Q), not n_states * n_actions.
+"""
+
+import heapq
+import random
+
+from action_selection import epsilon_greedy
+from metrics import MetricsRecorder
+from stats import log_progress
+from checkpoint import load_checkpoint
+from qtable import new_qtable
+
+
+class PriorityQueue:
+    """
+    Max-priority queue of flat (state, action) keys, at most one
+    live entry per key.
+    """
+
+    def __init__(self):
+        self._heap = []
+
+        # Priority of the live entry of every queued key
+        self._priority = {}
+
+    def push(self, key, priority):
+        """
+        Queue key, or raise its priority if it is already queued.
+        """
+        if priority > self._priority.get(key, 0.0):
+            self._priority[key] = priority
+            heapq.heappush(self._heap, (-priority, key))
+
+    def pop(self):
+        """
+        Remove and return the key with the highest priority
+        (None if the queue is empty).
+        """
+
+        heap, current = self._heap, self._priority
+
+        while heap:
+            negative, key = heapq.heappop(heap)
+
+            # Skip entries whose priority was raised later
+            if current.get(key) == -negative:
+                del current[key]
+                return key
+
+        return None
+
+
+def prioritized_sweeping(env, seed=None, config=None, alpha=1.0, theta=1e-5,
+                         metrics=None, log_every=None, monitor=None,
+                         checkpointer=None, resume_from=None, profiler=None,
+                         evaluator=None):
+    """
+    Prioritized sweeping with config.planning_steps backups per real step.
+
+    Inputs (besides those shared with q_learning):
+        alpha → step size of the model backups. FrozenLakeEnv is
+                deterministic, so the learned model is exact and full
+                backups (alpha = 1.0) are safe; config.alpha is not used.
+        theta → pairs with a smaller priority are not queued
+
+    The model and queue are not part of checkpoints: after resume_from
+    they are rebuilt from new experience.
+    """
+
+    # Experiment settings (default: the ones the env was built with)
+    if config is None:
+        config = env.config
+
+    num_episodes = config.num_episodes
+    max_steps = config.max_steps_per_episode
+    discount, epsilon = config.discount, config.epsilon
+    planning_steps = config.planning_steps
+
+    n_actions = env.n_actions
+
+    Q = new_qtable(env, config)
+    queue = PriorityQueue()
+
+    # Pairs leading into each state (NumPy CSR arrays):
+    # pred_keys[indptr[s]:indptr[s + 1]] all have next state s
+    indptr, pred_keys = env.predecessor_index()
+
+    # Learned model: flat key state * n_actions + action
+    # → (next_state, reward, done), for observed pairs only
+    model = {}
+
+    # Private random stream (reproducible when seed is given)
+    rng = random.Random(seed)
+
+    # Per-episode reward / steps / success history
+    if metrics is None:
+        metrics = MetricsRecorder(num_episodes, max_steps=max_steps)
+
+    # Continue from a saved checkpoint
+    start = 0
+    if resume_from is not None:
+        Q, start = load_checkpoint(resume_from, metrics, rng, Q)
+
+    def priority(key):
+        """
+        Bellman error of one observed pair under the model.
+        """
+        s, a = divmod(key, n_actions)
+        next_state, target, done = model[key]
+        if not done:
+            target += discount * max(Q.read_row(next_state).tolist())
+        return abs(target - Q.read_row(s)[a])
+
+    def plan(n):
+        """
+        Up to n backups in priority order.
+
+        Returns the number of backups made.
+        """
+
+        for i in range(n):
+            key = queue.pop()
+            if key is None:
+                return i
+
+            # Backup of the popped pair from the model
+            s, a = divmod(key, n_actions)
+            next_state, target, done = model[key]
+            if not done:
+                target += discount * max(Q.read_row(next_state).tolist())
+            q_s = Q.row(s)
+            q_s[a] += alpha * (target - q_s[a])
+
+            # V(s) may have changed: re-rank the observed pairs into s
+            for pred in pred_keys[indptr[s]:indptr[s + 1]].tolist():
+                if pred in model:
+                    p = priority(pred)
+                    if p > theta:
+                        queue.push(pred, p)
+
+        return n
+
+    # Swapped for timed versions on profiled episodes
+    select, step_index, run_planning = epsilon_greedy, env.step_index, plan
+
+    backups = 0
+
+    for episode in range(start, num_episodes):
+
+        if profiler is not None:
+            select, step_index, run_planning = profiler.start(
+                ("action_selection", epsilon_greedy),
+                ("env_step", env.step_index),
+                ("planning", plan),
+            )
+
+        state = env.reset()
+        total_reward = 0
+
+        for step in range(max_steps):
+
+            # Select action via epsilon-greedy
+            action = select(Q, state, epsilon, rng)
+
+            # Execute action
+            next_state, reward, done = step_index(state, action)
+
+            # Model learning
+            key = state * n_actions + action
+            if key not in model:
+                model[key] = (next_state, reward, done)
+
+            # Queue the real transition by its Bellman error
+            p = priority(key)
+            if p > theta:
+                queue.push(key, p)
+
+            # Planning in priority order
+            backups += run_planning(planning_steps)
+
+            total_reward += reward
+            state = next_state
+
+            if done:
+                break
+
+        # Q was updated in place through row views
+        Q.touch()
+
+        if profiler is not None:
+            profiler.mark("q_update")
+
+        # Recorded for every episode, including ones cut off
+        # at MAX_STEPS_PER_EPISODE
+        metrics.record(total_reward, step + 1, 1 if reward == 1 else 0)
+
+        if log_every:
+            log_progress("Prioritized Sweeping", metrics, log_every,
+                         metrics.count - 1)
+
+        # Early stopping once the monitor reports convergence
+        if monitor is not None and monitor.update(Q, metrics.count):
+            break
+
+        if checkpointer is not None:
+            checkpointer.update(Q, metrics, rng)
+
+        # Greedy-policy evaluation every K episodes
+        if evaluator is not None:
+            evaluator.update(Q, metrics.count)
+
+        if profiler is not None:
+            profiler.mark("bookkeeping")
+
+    metrics.meta["backups"] = backups
+
+    if monitor is not None:
+        metrics.meta["converged_episode"] = monitor.converged_at
+
+    if profiler is not None:
+        metrics.meta["profile"] = profiler.report()
+
+    if evaluator is not None:
+        metrics.meta["evaluation"] = evaluator.history
+
+    if checkpointer is not None:
+        checkpointer.save(Q, metrics, rng)
+
+    return Q, metrics
@@ -0,0 +1,229 @@
+"""
+profiling.py
+
+Optional per-phase timing of the learners.
+
+Every learner takes profiler=PhaseProfiler(...). Time is split into:
+
+    action_selection → epsilon-greedy calls
+    env_step         → environment transitions
+    q_update         → Q-value updates
+    bookkeeping      → everything else (metrics, logging, monitor,
+                       checkpoints, episode buffers)
+
+How it stays cheap:
+- Disabled (profiler=None) the inner loops are unchanged; the
+  learners only test `profiler is not None` once per episode.
+- Only every `sample_every`-th episode (or batch step) is timed.
+  On those, the learner calls wrapped versions of the selection
+  and step functions, which time each call. The remaining phases
+  are timed between marks, minus the time of wrapped calls and
+  their calibrated overhead.
+
+After training the report is stored in metrics.meta["profile"]:
+
+    {"units": 250000, "sampled": 2500, "sample_every": 100,
+     "total_seconds": ...,
+     "phases": {"action_selection": {"seconds", "calls",
+                                     "fraction", "ns_per_call"}, ...}}
+
+`seconds` are measured on the sampled units only; `fraction`
+is the share of the sampled time.
+"""
+
+import time
+
+# Phases in report order
+PHASES = ("action_selection", "env_step", "q_update", "bookkeeping")
+
+
+class PhaseProfiler:
+    """
+    Sampled wall-clock timer for the phases of a training loop.
+    """
+
+    def __init__(self, sample_every=1):
+        """
+        Inputs:
+            sample_every → time one episode (or batch step) in this many
+        """
+
+        self.sample_every = max(int(sample_every), 1)
+
+        # phase → [seconds, calls]
+        self._phases = {phase: [0.0, 0] for phase in PHASES}
+
+        # Time and number of wrapped calls since the start of profiling
+        self._inner = [0.0, 0]
+
+        self.units = 0
+        self.sampled = 0
+        self.active = False
+
+        self._wrappers = {}
+        self._last_mark = 0.0
+        self._inner_at_mark = (0.0, 0)
+
+        self._overhead = self._calibrate()
+
+    # --------------------------------------------------
+    # Wrapped calls
+    # --------------------------------------------------
+
+    def wrap(self, phase, fn):
+        """
+        Version of fn that adds its run time to `phase`.
+        """
+
+        key = (phase, fn)
+        timed = self._wrappers.get(key)
+        if timed is not None:
+            return timed
+
+        cell = self._phases.setdefault(phase, [0.0, 0])
+        inner = self._inner
+        perf = time.perf_counter
+
+        def timed(*args):
+            start = perf()
+            result = fn(*args)
+            elapsed = perf() - start
+            cell[0] += elapsed
+            cell[1] += 1
+            inner[0] += elapsed
+            inner[1] += 1
+            return result
+
+        self._wrappers[key] = timed
+        return timed
+
+    def _calibrate(self, n=20000):
+        """
+        Wrapper cost per call that is not inside its own timing
+        window (subtracted from the phases timed by mark).
+        """
+
+        def noop():
+            pass
+
+        probe = PhaseProfiler.__new__(PhaseProfiler)
+        probe._phases = {}
+        probe._inner = [0.0, 0]
+        probe._wrappers = {}
+        timed = probe.wrap("calibration", noop)
+
+        perf = time.perf_counter
+        start = perf()
+        for _ in range(n):
+            noop()
+        plain = perf() - start
+
+        start = perf()
+        for _ in range(n):
+            timed()
+        wrapped = perf() - start
+
+        return max((wrapped - probe._inner[0] - plain) / n, 0.0)
+
+    # --------------------------------------------------
+    # Sampled units
+    # --------------------------------------------------
+
+    def start(self, *fns):
+        """
+        Begin one episode (or batch step).
+
+        Inputs:
+            fns → (phase, function) pairs used by the learner's loop
+
+        Returns:
+            the functions to call during this unit: wrapped versions
+            if the unit is sampled, the plain ones otherwise
+        """
+
+        self.active = self.units % self.sample_every == 0
+        self.units += 1
+
+        if not self.active:
+            return tuple(fn for _, fn in fns)
+
+        self.sampled += 1
+        self._inner_at_mark = tuple(self._inner)
+        self._last_mark = time.perf_counter()
+
+        return tuple(self.wrap(phase, fn) for phase, fn in fns)
+
+    def mark(self, phase):
+        """
+        Charge the time since the previous mark (or start) to `phase`,
+        excluding wrapped calls made in between.
+        """
+
+        if not self.active:
+            return
+
+        now = time.perf_counter()
+        inner_seconds = self._inner[0] - self._inner_at_mark[0]
+        inner_calls = self._inner[1] - self._inner_at_mark[1]
+
+        elapsed = (now - self._last_mark) - inner_seconds
+        elapsed -= inner_calls * self._overhead
+
+        cell = self._phases.setdefault(phase, [0.0, 0])
+        cell[0] += max(elapsed, 0.0)
+
+        self._inner_at_mark = tuple(self._inner)
+        self._last_mark = now
+
+    # --------------------------------------------------
+    # Results
+    # --------------------------------------------------
+
+    def report(self):
+        """
+        Structured timing report (JSON-serializable).
+        """
+
+        total = sum(seconds for seconds, _ in self._phases.values())
+
+        phases = {}
+        for phase, (seconds, calls) in self._phases.items():
+            phases[phase] = {
+                "seconds": seconds,
+                "calls": calls,
+                "fraction": seconds / total if total else 0.0,
+                "ns_per_call": seconds / calls * 1e9 if calls else None,
+            }
+
+        return {
+            "units": self.units,
+            "sampled": self.sampled,
+            "sample_every": self.sample_every,
+            "total_seconds": total,
+            "phases": phases,
+        }
+
+    def __str__(self):
+        return format_report(self.report())
+
+
+def format_report(report):
+    """
+    Plain-text table of a report (e.g. metrics.meta["profile"]).
+    """
+
+    lines = [
+        f"{report['sampled']} of {report['units']} units timed, "
+        f"{report['total_seconds']:.3f}s"
+    ]
+
+    for phase, r in report["phases"].items():
+        per_call = (
+            f"{r['ns_per_call']:8.0f} ns/call"
+            if r["ns_per_call"] is not None else ""
+        )
+        lines.append(
+            f"  {phase:<17} {r['fraction']:6.1%} {r['seconds']:9.3f}s  {per_call}"
+        )
+
+    return "\n".join(lines)
@@ -3,56 +3,244 @@ Q-Learning (Off-policy TD Control)
 
 Update rule:
 Q(s,a) ← Q(s,a) + α [ r + γ max_a' Q(s',a') - Q(s,a) ]
+
+q_learning_batched applies the same rule to a batch of
+parallel episodes (BatchFrozenLakeEnv) one vectorized step at a time.
 """
 
-from collections import defaultdict
-from config import *
-from misc import epsilon_greedy
+import random
+
+import numpy as np
+
+from env import BatchFrozenLakeEnv
+from action_selection import epsilon_greedy, epsilon_greedy_batch
+from metrics import MetricsRecorder
+from stats import log_progress
+from checkpoint import load_checkpoint
+from qtable import new_qtable
+
+def q_learning(env, seed=None, config=None, metrics=None, log_every=None,
+               monitor=None, checkpointer=None, resume_from=None,
+               profiler=None, evaluator=None):
+
+    # Experiment settings (default: the ones the env was built with)
+    if config is None:
+        config = env.config
+
+    num_episodes = config.num_episodes
+    max_steps = config.max_steps_per_episode
+    alpha, discount, epsilon = config.alpha, config.discount, config.epsilon
+
+    Q = new_qtable(env, config)
 
-def q_learning(env):
+    # Private random stream (reproducible when seed is given)
+    rng = random.Random(seed)
 
-    Q = defaultdict(lambda: {a: 0.0 for a in ACTIONS})
+    # Per-episode reward / steps / success history
+    if metrics is None:
+        metrics = MetricsRecorder(num_episodes, max_steps=max_steps)
 
-    episode_rewards = []
-    episode_steps = []
-    episode_success = []
+    # Continue from a saved checkpoint
+    start = 0
+    if resume_from is not None:
+        Q, start = load_checkpoint(resume_from, metrics, rng, Q)
 
-    for episode in range(NUM_EPISODES):
+    # Swapped for timed versions on profiled episodes
+    select, step_index = epsilon_greedy, env.step_index
+
+    for episode in range(start, num_episodes):
+
+        if profiler is not None:
+            select, step_index = profiler.start(
+                ("action_selection", epsilon_greedy),
+                ("env_step", env.step_index),
+            )
 
         state = env.reset()
         total_reward = 0
 
-        for step in range(MAX_STEPS_PER_EPISODE):
+        for step in range(max_steps):
 
             # Select action via epsilon-greedy
-            action = epsilon_greedy(Q, state, EPSILON)
+            action = select(Q, state, epsilon, rng)
 
             # Execute action
-            next_state, reward, done = env.step(action)
+            next_state, reward, done = step_index(state, action)
 
             # Greedy estimate of next state's value
-            best_next_q = max(Q[next_state].values())
+            # (max over plain floats: cheaper than a NumPy reduction
+            # on a 4-element row)
+            best_next_q = max(Q.read_row(next_state).tolist())
 
             # Q-learning update (off-policy)
-            Q[state][action] += ALPHA * (
+            q_s = Q.row(state)
+            q_s[action] += alpha * (
                 reward +
-                DISCOUNT * best_next_q -
-                Q[state][action]
+                discount * best_next_q -
+                q_s[action]
             )
 
             total_reward += reward
             state = next_state
 
             if done:
-                episode_rewards.append(total_reward)
-                episode_steps.append(step + 1)
-                episode_success.append(1 if reward == 1 else 0)
                 break
 
-    metrics = {
-        "rewards": episode_rewards,
-        "steps": episode_steps,
-        "success": episode_success
-    }
+        # Q was updated in place through row views
+        Q.touch()
+
+        if profiler is not None:
+            profiler.mark("q_update")
+
+        # Recorded for every episode, including ones cut off
+        # at MAX_STEPS_PER_EPISODE
+        metrics.record(total_reward, step + 1, 1 if reward == 1 else 0)
+
+        if log_every:
+            log_progress("Q-Learning", metrics, log_every, metrics.count - 1)
+
+        # Early stopping once the monitor reports convergence
+        if monitor is not None and monitor.update(Q, metrics.count):
+            break
+
+        if checkpointer is not None:
+            checkpointer.update(Q, metrics, rng)
+
+        # Greedy-policy evaluation every K episodes
+        if evaluator is not None:
+            evaluator.update(Q, metrics.count)
+
+        if profiler is not None:
+            profiler.mark("bookkeeping")
+
+    if monitor is not None:
+        metrics.meta["converged_episode"] = monitor.converged_at
+
+    if profiler is not None:
+        metrics.meta["profile"] = profiler.report()
+
+    if evaluator is not None:
+        metrics.meta["evaluation"] = evaluator.history
+
+    if checkpointer is not None:
+        checkpointer.save(Q, metrics, rng)
+
+    return Q, metrics
+
+
+def q_learning_batched(env, n_envs=1024, duplicates="add", seed=None,
+                       config=None, metrics=None, log_every=None,
+                       monitor=None, checkpointer=None, resume_from=None,
+                       profiler=None, evaluator=None):
+    """
+    Q-learning over n_envs episodes running in lockstep.
+
+    Every env step produces n_envs transitions, which are applied
+    in one vectorized TD update (see QTable.td_update for the
+    meaning of duplicates = "add" / "last").
+
+    Training stops once config.num_episodes episodes have finished, or
+    earlier if the optional ConvergenceMonitor reports convergence.
+    """
+
+    # Experiment settings (default: the ones the env was built with)
+    if config is None:
+        config = env.config
+
+    num_episodes = config.num_episodes
+    max_steps = config.max_steps_per_episode
+    alpha, discount, epsilon = config.alpha, config.discount, config.epsilon
+
+    Q = new_qtable(env, config)
+    batch_env = BatchFrozenLakeEnv(n_envs, env, max_steps)
+    rng = np.random.default_rng(seed)
+
+    # Per-episode reward / steps / success history
+    if metrics is None:
+        metrics = MetricsRecorder(num_episodes, max_steps=max_steps)
+
+    # Continue from a saved checkpoint
+    # (episodes that were in flight when it was saved are restarted)
+    if resume_from is not None:
+        Q, _ = load_checkpoint(resume_from, metrics, rng, Q)
+
+    states = batch_env.reset()
+    total_reward = np.zeros(n_envs, dtype=np.int64)
+
+    # Swapped for timed versions on profiled batch steps
+    select, step, td_update = epsilon_greedy_batch, batch_env.step, Q.td_update
+
+    while metrics.count < num_episodes:
+
+        if profiler is not None:
+            select, step, td_update = profiler.start(
+                ("action_selection", epsilon_greedy_batch),
+                ("env_step", batch_env.step),
+                ("q_update", Q.td_update),
+            )
+
+        # Select one action per slot via epsilon-greedy
+        actions = select(Q, states, epsilon, rng)
+
+        # Execute all actions at once
+        next_states, rewards, dones, truncated = step(actions)
+
+        # Greedy estimate of next state's value (0 for terminal states)
+        best_next_q = Q.rows(next_states).max(axis=1) * ~dones
+
+        # Q-learning update (off-policy) for the whole batch
+        td_update(
+            states, actions,
+            rewards + discount * best_next_q,
+            alpha, duplicates
+        )
+
+        if profiler is not None:
+            profiler.mark("q_update")
+
+        total_reward += rewards
+        ended = np.flatnonzero(dones | truncated)
+
+        if ended.size:
+            previous_count = metrics.count
+            recorded = ended[:num_episodes - metrics.count]
+            metrics.record_batch(
+                total_reward[recorded],
+                batch_env.episode_lengths[recorded],
+                rewards[recorded] == 1
+            )
+            total_reward[ended] = 0
+
+            if log_every:
+                log_progress("Q-Learning", metrics, log_every, previous_count)
+
+            # Early stopping once the monitor reports convergence
+            if monitor is not None and monitor.update(Q, metrics.count):
+                break
+
+            if checkpointer is not None:
+                checkpointer.update(Q, metrics, rng)
+
+            # Greedy-policy evaluation every K episodes
+            if evaluator is not None:
+                evaluator.update(Q, metrics.count)
+
+        # Finished slots were already reset by the batch env
+        states = batch_env.states
+
+        if profiler is not None:
+            profiler.mark("bookkeeping")
+
+    if monitor is not None:
+        metrics.meta["converged_episode"] = monitor.converged_at
+
+    if profiler is not None:
+        metrics.meta["profile"] = profiler.report()
+
+    if evaluator is not None:
+        metrics.meta["evaluation"] = evaluator.history
+
+    if checkpointer is not None:
+        checkpointer.save(Q, metrics, rng)
 
-    return Q, metrics
\ No newline at end of file
+    return Q, metrics
@@ -0,0 +1,569 @@
+"""
+qtable.py
+
+Array-backed Q-table shared by all learners.
+
+Q-values are stored in a dense (n_states, n_actions) NumPy float array.
+Actions are integer ids that index into config.ACTIONS:
+
+    0 → 'UP', 1 → 'DOWN', 2 → 'LEFT', 3 → 'RIGHT'
+
+The learners write rows directly through Q.row(state) and read
+them through Q.read_row(state).
+For printing and plotting, Q[state] still behaves like the old
+dictionary {'UP': value, 'DOWN': value, ...}, so code written for the
+defaultdict-of-dicts layout keeps working.
+
+One difference: `state in Q` used to mean "visited" (the defaultdict
+created a row on every read). With a preallocated table it means
+"learned", i.e. some Q-value of the state is non-zero. Visited states
+whose values are all still zero have no meaningful greedy action, so
+print_policy prints them as '·' and plot_policy_path draws no arrow
+there, instead of showing the arbitrary first action.
+
+BlockQTable has the same interface but allocates rows in blocks of
+consecutive states only when a state is first written, for maps far
+larger than the part the agent ever visits. new_qtable picks the
+storage named by config.q_storage ("dense" or "block").
+
+Batched code goes through rows / gather / add (not .values), so it
+works with both storages.
+
+Q.version counts modifications, so derived data (policy.py) can be
+cached until the table changes. td_update and add bump it; code that
+writes through row() views calls Q.touch() when it is done.
+"""
+
+from collections.abc import Mapping
+
+import numpy as np
+
+from config import ACTIONS
+
+# Action name → integer id
+ACTION_INDEX = {a: i for i, a in enumerate(ACTIONS)}
+
+
+class StateView(Mapping):
+    """
+    Read-only dict-like view of one row of a Q-table.
+
+    Keys are action names, values are the current Q-values.
+    """
+
+    __slots__ = ("_row",)
+
+    def __init__(self, row):
+        self._row = row
+
+    def __getitem__(self, action):
+        return float(self._row[ACTION_INDEX[action]])
+
+    def __iter__(self):
+        return iter(ACTIONS)
+
+    def __len__(self):
+        return len(ACTIONS)
+
+
+def td_deltas(keys, current, targets, alpha, duplicates):
+    """
+    Combine a batch of TD updates per (state, action) key
+    (see QTable.td_update for the duplicates modes).
+
+    Inputs:
+        keys    → flat state * n_actions + action keys
+        current → current Q-value of every key
+        targets → TD target of every key
+
+    Returns:
+        pairs  → distinct keys
+        deltas → change to add to each of them
+    """
+
+    if duplicates == "add":
+        pairs, inverse, counts = np.unique(
+            keys, return_inverse=True, return_counts=True
+        )
+        errors = targets - current
+        error_sum = np.bincount(inverse, weights=errors, minlength=len(pairs))
+
+        step = 1.0 - (1.0 - alpha) ** counts
+        return pairs, step * error_sum / counts
+
+    if duplicates == "last":
+        # Index of the last occurrence of every (state, action) key
+        _, rev_first = np.unique(keys[::-1], return_index=True)
+        last = len(keys) - 1 - rev_first
+
+        return keys[last], alpha * (targets[last] - current[last])
+
+    raise ValueError(f"Unknown duplicates mode: {duplicates!r}")
+
+
+class QTable:
+    """
+    Dense Q-table of shape (n_states, n_actions).
+    """
+
+    def __init__(self, n_states, n_actions=len(ACTIONS), dtype=np.float64):
+        """
+        Inputs:
+            n_states  → number of environment states
+            n_actions → number of actions (default: len(ACTIONS))
+            dtype     → floating point type of the table
+        """
+
+        self.n_states = n_states
+        self.n_actions = n_actions
+
+        # Every state-action value starts at 0.0
+        self.values = np.zeros((n_states, n_actions), dtype=dtype)
+
+        # Modification counter (see touch)
+        self.version = 0
+
+    @classmethod
+    def for_env(cls, env, **kwargs):
+        """
+        Create an empty Q-table sized for a FrozenLakeEnv.
+        """
+        return cls(env.rows * env.cols, **kwargs)
+
+    @classmethod
+    def from_values(cls, values):
+        """
+        Wrap an existing (n_states, n_actions) array without copying.
+        """
+        Q = cls.__new__(cls)
+        Q.n_states, Q.n_actions = values.shape
+        Q.values = values
+        Q.version = 0
+        return Q
+
+    def row(self, state):
+        """
+        Writable view of the action-values of one state.
+        """
+        return self.values[state]
+
+    def read_row(self, state):
+        """
+        Action-values of one state for reading only
+        (the same view as row; BlockQTable does not allocate here).
+        """
+        return self.values[state]
+
+    def touch(self):
+        """
+        Record that values were changed in place (through row views
+        or .values), invalidating cached policies.
+        """
+        self.version += 1
+
+    def rows(self, states):
+        """
+        (len(states), n_actions) array of the rows of many states.
+        """
+        return self.values[states]
+
+    def gather(self, states, actions):
+        """
+        Q(s, a) for arrays of states and actions.
+        """
+        return self.values[states, actions]
+
+    def add(self, states, actions, deltas):
+        """
+        Q(s, a) += delta for arrays of distinct (state, action) pairs.
+        """
+        self.values[states, actions] += deltas
+        self.version += 1
+
+    def stored_states(self):
+        """
+        States whose rows are stored (all of them for a dense table).
+        """
+        return np.arange(self.n_states)
+
+    def set_rows(self, states, values):
+        """
+        Overwrite the rows of distinct states.
+        """
+        self.values[states] = values
+        self.version += 1
+
+    def td_update(self, states, actions, targets, alpha, duplicates="add"):
+        """
+        Apply Q(s,a) ← Q(s,a) + α [ target - Q(s,a) ] to a whole batch
+        of transitions at once.
+
+        The same (state, action) pair may appear several times
+        in one batch. The duplicates flag decides what happens:
+
+            "add"  → scatter-add: the k copies of a pair each compute
+                     their TD error against the old value, the errors
+                     are summed, and their mean is applied with the
+                     compounded step 1 - (1 - α)^k. This equals k
+                     sequential updates when the targets agree and,
+                     unlike a raw sum, stays stable for large batches.
+            "last" → last-writer-wins: only the last copy in the
+                     batch is applied, the others are dropped
+
+        Inputs:
+            states, actions → integer arrays of equal length
+            targets         → TD targets (same length)
+            alpha           → learning rate
+            duplicates      → "add" or "last"
+        """
+
+        # Flat (state, action) keys into the row-major value array
+        keys = states * self.n_actions + actions
+        flat = self.values.reshape(-1)
+
+        pairs, deltas = td_deltas(keys, flat[keys], targets, alpha, duplicates)
+        flat[pairs] += deltas
+        self.version += 1
+
+    def __getitem__(self, state):
+        """
+        Dict-like read view: Q[state][action_name] → value.
+        """
+        return StateView(self.values[state])
+
+    def __contains__(self, state):
+        """
+        A state counts as learned once any of its Q-values is non-zero
+        (not merely visited; see the module docstring).
+        """
+        return 0 <= state < self.n_states and bool(self.values[state].any())
+
+    def __len__(self):
+        return self.n_states
+
+    @property
+    def nbytes(self):
+        """
+        Memory used by the value array (bytes).
+        """
+        return self.values.nbytes
+
+
+class BlockQTable:
+    """
+    Lazily allocated Q-table with the QTable interface.
+
+    States are grouped into blocks of `block_size` consecutive
+    indices. A block's rows are allocated (as zeros) the first time
+    a state in it is written through row() or add(). Blocks live in
+    fixed-size chunks that are never reallocated, so row views stay
+    valid while new blocks are added.
+
+    Reads (read_row, rows, gather, values, Q[state]) never allocate:
+    an unallocated state reads as zeros. Use row() only for writing.
+    """
+
+    def __init__(self, n_states, n_actions=len(ACTIONS), dtype=np.float64,
+                 block_size=256, chunk_blocks=64, max_bytes=None):
+        """
+        Inputs:
+            n_states     → number of environment states
+            n_actions    → number of actions (default: len(ACTIONS))
+            dtype        → floating point type of the values
+            block_size   → states per block (power of two)
+            chunk_blocks → blocks per allocated chunk
+            max_bytes    → memory budget for the values
+                           (MemoryError when exceeded, None = no limit)
+        """
+
+        if block_size & (block_size - 1):
+            raise ValueError("block_size must be a power of two")
+
+        self.n_states = n_states
+        self.n_actions = n_actions
+        self.dtype = np.dtype(dtype)
+        self.block_size = block_size
+        self.max_bytes = max_bytes
+
+        self._shift = block_size.bit_length() - 1
+        self._mask = block_size - 1
+
+        # Block id → slot (-1 = not allocated); list copy for scalar access
+        n_blocks = -(-n_states // block_size)
+        self.chunk_blocks = min(chunk_blocks, n_blocks)
+        self._slot_array = np.full(n_blocks, -1, dtype=np.int64)
+        self._slots = [-1] * n_blocks
+
+        # Chunks of chunk_blocks * block_size rows each
+        self._chunks = []
+        self.allocated_blocks = 0
+
+        # Shared read-only row returned for unallocated states
+        self._zero_row = np.zeros(n_actions, dtype=self.dtype)
+        self._zero_row.flags.writeable = False
+
+        # Modification counter (see QTable.touch)
+        self.version = 0
+
+    @classmethod
+    def for_env(cls, env, **kwargs):
+        """
+        Create an empty block Q-table sized for a FrozenLakeEnv.
+        """
+        return cls(env.rows * env.cols, **kwargs)
+
+    # --------------------------------------------------
+    # Allocation
+    # --------------------------------------------------
+
+    def _allocate(self, blocks):
+        """
+        Give slots to distinct, not yet allocated block ids.
+        """
+
+        needed = self.allocated_blocks + len(blocks)
+        chunk_rows = self.chunk_blocks * self.block_size
+        chunk_bytes = chunk_rows * self.n_actions * self.dtype.itemsize
+
+        n_chunks = -(-needed // self.chunk_blocks)
+        if (self.max_bytes is not None and
+                n_chunks * chunk_bytes > self.max_bytes):
+            raise MemoryError(
+                f"BlockQTable needs {n_chunks * chunk_bytes} bytes, "
+                f"budget is {self.max_bytes}"
+            )
+
+        while len(self._chunks) < n_chunks:
+            self._chunks.append(
+                np.zeros((chunk_rows, self.n_actions), dtype=self.dtype)
+            )
+
+        new_slots = np.arange(self.allocated_blocks, needed)
+        self._slot_array[blocks] = new_slots
+        for block, slot in zip(np.atleast_1d(blocks).tolist(), new_slots.tolist()):
+            self._slots[block] = slot
+        self.allocated_blocks = needed
+
+    def _locate(self, states, allocate):
+        """
+        (chunk, row within chunk) of many states; chunk = -1 where
+        the state is not allocated (only when allocate is False).
+        """
+
+        states = np.asarray(states)
+        blocks = states >> self._shift
+        slots = self._slot_array[blocks]
+
+        if allocate:
+            missing = np.unique(blocks[slots < 0])
+            if missing.size:
+                self._allocate(missing)
+                slots = self._slot_array[blocks]
+
+        chunk, offset = np.divmod(slots, self.chunk_blocks)
+        rows = offset * self.block_size + (states & self._mask)
+        return np.where(slots < 0, -1, chunk), rows
+
+    # --------------------------------------------------
+    # QTable interface
+    # --------------------------------------------------
+
+    def row(self, state):
+        """
+        Writable view of the action-values of one state
+        (allocates its block on first use).
+        """
+
+        block = state >> self._shift
+        slot = self._slots[block]
+        if slot < 0:
+            self._allocate(np.array([block]))
+            slot = self._slots[block]
+
+        chunk, offset = divmod(slot, self.chunk_blocks)
+        return self._chunks[chunk][offset * self.block_size + (state & self._mask)]
+
+    def read_row(self, state):
+        """
+        Action-values of one state for reading only (a read-only
+        zero row if its block is not allocated; never allocates).
+        """
+
+        slot = self._slots[state >> self._shift]
+        if slot < 0:
+            return self._zero_row
+
+        chunk, offset = divmod(slot, self.chunk_blocks)
+        return self._chunks[chunk][offset * self.block_size + (state & self._mask)]
+
+    def touch(self):
+        """
+        Record that values were changed through row views.
+        """
+        self.version += 1
+
+    def rows(self, states):
+        """
+        (len(states), n_actions) array of the rows of many states.
+        """
+
+        chunks, rows = self._locate(states, allocate=False)
+        out = np.zeros((len(rows), self.n_actions), dtype=self.dtype)
+
+        for chunk in np.unique(chunks[chunks >= 0]).tolist():
+            sel = chunks == chunk
+            out[sel] = self._chunks[chunk][rows[sel]]
+
+        return out
+
+    def gather(self, states, actions):
+        """
+        Q(s, a) for arrays of states and actions.
+        """
+        return self.rows(states)[np.arange(len(actions)), actions]
+
+    def add(self, states, actions, deltas):
+        """
+        Q(s, a) += delta for arrays of distinct (state, action) pairs.
+        """
+
+        chunks, rows = self._locate(states, allocate=True)
+        actions = np.asarray(actions)
+        deltas = np.broadcast_to(deltas, rows.shape)
+
+        for chunk in np.unique(chunks).tolist():
+            sel = chunks == chunk
+            self._chunks[chunk][rows[sel], actions[sel]] += deltas[sel]
+
+        self.version += 1
+
+    def stored_states(self):
+        """
+        States of the allocated blocks, in increasing order.
+        """
+
+        blocks = np.flatnonzero(self._slot_array >= 0)
+        states = (blocks[:, None] * self.block_size +
+                  np.arange(self.block_size)).ravel()
+        return states[states < self.n_states]
+
+    def set_rows(self, states, values):
+        """
+        Overwrite the rows of distinct states (allocating their blocks).
+        """
+
+        chunks, rows = self._locate(states, allocate=True)
+        values = np.asarray(values)
+
+        for chunk in np.unique(chunks).tolist():
+            sel = chunks == chunk
+            self._chunks[chunk][rows[sel]] = values[sel]
+
+        self.version += 1
+
+    def td_update(self, states, actions, targets, alpha, duplicates="add"):
+        """
+        Batched TD update, same rules as QTable.td_update.
+        """
+
+        keys = states * self.n_actions + actions
+        current = self.gather(states, actions)
+
+        pairs, deltas = td_deltas(keys, current, targets, alpha, duplicates)
+        self.add(pairs // self.n_actions, pairs % self.n_actions, deltas)
+
+    @property
+    def values(self):
+        """
+        Dense (n_states, n_actions) copy of the table (read-only use:
+        writes to it do not reach the table).
+        """
+        return self.rows(np.arange(self.n_states))
+
+    def __getitem__(self, state):
+        """
+        Dict-like read view: Q[state][action_name] → value.
+        """
+        return StateView(self.rows([state])[0])
+
+    def __contains__(self, state):
+        """
+        A state counts as learned once any of its Q-values is non-zero
+        (not merely visited; see the module docstring).
+        """
+        if not 0 <= state < self.n_states:
+            return False
+        return bool(self.rows([state])[0].any())
+
+    def __len__(self):
+        return self.n_states
+
+    @property
+    def nbytes(self):
+        """
+        Memory used by the allocated chunks and the block directory (bytes).
+        """
+        return (sum(chunk.nbytes for chunk in self._chunks) +
+                self._slot_array.nbytes)
+
+
+def new_qtable(env, config=None):
+    """
+    Empty Q-table for env with the storage named in the config
+    (default: env.config).
+
+        config.q_storage   → "dense" (QTable) or "block" (BlockQTable)
+        config.q_max_bytes → memory budget of a BlockQTable
+    """
+
+    if config is None:
+        config = env.config
+
+    return empty_qtable(env.rows * env.cols, config)
+
+
+def empty_qtable(n_states, config):
+    """
+    Empty Q-table of n_states rows with the storage named in config
+    (new_qtable without an environment).
+    """
+
+    if config.q_storage == "dense":
+        return QTable(n_states)
+
+    if config.q_storage == "block":
+        return BlockQTable(n_states, max_bytes=config.q_max_bytes)
+
+    raise ValueError(f"Unknown q_storage: {config.q_storage!r}")
+
+
+def qtable_arrays(Q):
+    """
+    Arrays that describe Q, for np.savez:
+
+        q_states → states whose rows are stored
+                   (only the allocated blocks of a BlockQTable)
+        q_values → (len(q_states), n_actions) values of those rows
+    """
+
+    states = Q.stored_states()
+    return {"q_states": states, "q_values": Q.rows(states)}
+
+
+def fill_qtable(Q, data):
+    """
+    Write arrays saved from qtable_arrays into the empty table Q.
+
+    Files that only hold a full q_values array (written before
+    q_states existed) are read as one row per state.
+    """
+
+    values = data["q_values"]
+    if "q_states" in data.files:
+        states = data["q_states"]
+    else:
+        states = np.arange(len(values))
+
+    if len(states):
+        Q.set_rows(states, values)
+    return Q
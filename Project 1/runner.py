@@ -0,0 +1,146 @@
+"""
+runner.py
+
+Runs many (algorithm, seed) training jobs concurrently
+on a process pool.
+
+Each worker:
+- builds its own FrozenLakeEnv from the job's ExperimentConfig
+- trains with its own reproducible random stream
+- sends back its Q-table and MetricsRecorder
+  (pickled as single typed buffers instead of long Python lists;
+  a BlockQTable travels as its allocated chunks, never densified)
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from env import FrozenLakeEnv
+from mc_control import monte_carlo_control
+from sarsa import sarsa
+from q_learning import q_learning
+from dyna_q import dyna_q
+from prioritized_sweeping import prioritized_sweeping
+
+# Algorithm name → training function
+ALGORITHMS = {
+    "Monte Carlo": monte_carlo_control,
+    "SARSA": sarsa,
+    "Q-Learning": q_learning,
+    "Dyna-Q": dyna_q,
+    "Prioritized Sweeping": prioritized_sweeping,
+}
+
+# Config fields an algorithm never reads. Sweeps reset them to the
+# DEFAULT_CONFIG values for that algorithm, so e.g. an alpha dimension
+# does not train the same Monte Carlo job once per value.
+IGNORED_FIELDS = {
+    "Monte Carlo": ("alpha", "planning_steps"),
+    "SARSA": ("mc_alpha", "planning_steps"),
+    "Q-Learning": ("mc_alpha", "planning_steps"),
+    "Dyna-Q": ("mc_alpha",),
+    "Prioritized Sweeping": ("alpha", "mc_alpha"),
+}
+
+# Algorithms trained when none are named (the model-based learners
+# are opt-in, as in main.DEFAULT_ALGORITHMS)
+DEFAULT_ALGORITHMS = ["Monte Carlo", "SARSA", "Q-Learning"]
+
+
+# ============================================================
+# 1. Seeding
+# ============================================================
+
+def job_seed(base_seed, algo_index, seed):
+    """
+    Derive an independent integer seed for one (algorithm, seed) job.
+
+    SeedSequence spawn keys give statistically independent streams,
+    and the same inputs always give the same stream.
+    """
+
+    seq = np.random.SeedSequence(base_seed, spawn_key=(algo_index, seed))
+    return int(seq.generate_state(1)[0])
+
+
+# ============================================================
+# 2. Worker
+# ============================================================
+
+def _train_job(job):
+    """
+    Train one algorithm with one seed (runs inside a worker).
+    """
+
+    name, seed, rng_seed, config = job
+
+    env = FrozenLakeEnv(config)
+
+    start = time.perf_counter()
+    Q, metrics = ALGORITHMS[name](env, seed=rng_seed)
+    elapsed = time.perf_counter() - start
+
+    return name, seed, Q, metrics, elapsed
+
+
+# ============================================================
+# 3. Runner
+# ============================================================
+
+def run_jobs(algorithms=None, seeds=(0,), processes=None, base_seed=0,
+             config=None):
+    """
+    Train every algorithm with every seed.
+
+    Inputs:
+        algorithms → names from ALGORITHMS (default: DEFAULT_ALGORITHMS)
+        seeds      → iterable of run seeds
+        processes  → pool size (None = CPU count, 1 = run in-process)
+        base_seed  → root of all derived random streams
+        config     → ExperimentConfig for every job
+                     (default: config.DEFAULT_CONFIG)
+
+    Returns:
+        dict keyed by (algorithm, seed):
+            {
+                "Q": QTable or BlockQTable (config.q_storage),
+                "metrics": MetricsRecorder,
+                "time": training time in seconds
+            }
+    """
+
+    if algorithms is None:
+        algorithms = list(DEFAULT_ALGORITHMS)
+
+    names = list(ALGORITHMS)
+    jobs = [
+        (name, seed, job_seed(base_seed, names.index(name), seed), config)
+        for name in algorithms
+        for seed in seeds
+    ]
+
+    if processes == 1:
+        outputs = map(_train_job, jobs)
+        return _collect(outputs)
+
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return _collect(pool.map(_train_job, jobs))
+
+
+def _collect(outputs):
+    """
+    Turn raw worker outputs into the result dictionary.
+    """
+
+    results = {}
+
+    for name, seed, Q, metrics, elapsed in outputs:
+        results[(name, seed)] = {
+            "Q": Q,
+            "metrics": metrics,
+            "time": elapsed,
+        }
+
+    return results
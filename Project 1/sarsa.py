@@ -3,61 +3,257 @@ SARSA (On-policy TD Control)
 
 Update rule:
 Q(s,a) ← Q(s,a) + α [ r + γ Q(s',a') - Q(s,a) ]
+
+sarsa_batched applies the same rule to a batch of
+parallel episodes (BatchFrozenLakeEnv) one vectorized step at a time.
 """
 
-from collections import defaultdict
-from config import *
-from misc import epsilon_greedy
+import random
+
+import numpy as np
+
+from env import BatchFrozenLakeEnv
+from action_selection import epsilon_greedy, epsilon_greedy_batch
+from metrics import MetricsRecorder
+from stats import log_progress
+from checkpoint import load_checkpoint
+from qtable import new_qtable
+
+def sarsa(env, seed=None, config=None, metrics=None, log_every=None,
+          monitor=None, checkpointer=None, resume_from=None, profiler=None,
+          evaluator=None):
+
+    # Experiment settings (default: the ones the env was built with)
+    if config is None:
+        config = env.config
+
+    num_episodes = config.num_episodes
+    max_steps = config.max_steps_per_episode
+    alpha, discount, epsilon = config.alpha, config.discount, config.epsilon
+
+    Q = new_qtable(env, config)
+
+    # Private random stream (reproducible when seed is given)
+    rng = random.Random(seed)
 
-def sarsa(env):
+    # Per-episode reward / steps / success history
+    if metrics is None:
+        metrics = MetricsRecorder(num_episodes, max_steps=max_steps)
 
-    Q = defaultdict(lambda: {a: 0.0 for a in ACTIONS})
+    # Continue from a saved checkpoint
+    start = 0
+    if resume_from is not None:
+        Q, start = load_checkpoint(resume_from, metrics, rng, Q)
 
-    episode_rewards = []
-    episode_steps = []
-    episode_success = []
+    # Swapped for timed versions on profiled episodes
+    select, step_index = epsilon_greedy, env.step_index
 
-    for episode in range(NUM_EPISODES):
+    for episode in range(start, num_episodes):
+
+        if profiler is not None:
+            select, step_index = profiler.start(
+                ("action_selection", epsilon_greedy),
+                ("env_step", env.step_index),
+            )
 
         state = env.reset()
 
         # Select first action BEFORE loop
-        action = epsilon_greedy(Q, state, EPSILON)
+        action = select(Q, state, epsilon, rng)
 
         total_reward = 0
 
-        for step in range(MAX_STEPS_PER_EPISODE):
+        for step in range(max_steps):
 
             # Take action
-            next_state, reward, done = env.step(action)
+            next_state, reward, done = step_index(state, action)
             total_reward += reward
 
+            q_s = Q.row(state)
+
             if done:
                 # Terminal update (no bootstrap)
-                Q[state][action] += ALPHA * (reward - Q[state][action])
-                episode_rewards.append(total_reward)
-                episode_steps.append(step + 1)
-                episode_success.append(1 if reward == 1 else 0)
+                q_s[action] += alpha * (reward - q_s[action])
                 break
 
             # Choose next action (on-policy)
-            next_action = epsilon_greedy(Q, next_state, EPSILON)
+            next_action = select(Q, next_state, epsilon, rng)
 
             # SARSA TD update
-            Q[state][action] += ALPHA * (
+            q_s[action] += alpha * (
                 reward +
-                DISCOUNT * Q[next_state][next_action] -
-                Q[state][action]
+                discount * Q.read_row(next_state)[next_action] -
+                q_s[action]
             )
 
             # Move forward
             state = next_state
             action = next_action
 
-    metrics = {
-        "rewards": episode_rewards,
-        "steps": episode_steps,
-        "success": episode_success
-    }
+        # Q was updated in place through row views
+        Q.touch()
+
+        if profiler is not None:
+            profiler.mark("q_update")
+
+        # Recorded for every episode, including ones cut off
+        # at MAX_STEPS_PER_EPISODE
+        metrics.record(total_reward, step + 1, 1 if reward == 1 else 0)
+
+        if log_every:
+            log_progress("SARSA", metrics, log_every, metrics.count - 1)
+
+        # Early stopping once the monitor reports convergence
+        if monitor is not None and monitor.update(Q, metrics.count):
+            break
+
+        if checkpointer is not None:
+            checkpointer.update(Q, metrics, rng)
+
+        # Greedy-policy evaluation every K episodes
+        if evaluator is not None:
+            evaluator.update(Q, metrics.count)
+
+        if profiler is not None:
+            profiler.mark("bookkeeping")
+
+    if monitor is not None:
+        metrics.meta["converged_episode"] = monitor.converged_at
+
+    if profiler is not None:
+        metrics.meta["profile"] = profiler.report()
+
+    if evaluator is not None:
+        metrics.meta["evaluation"] = evaluator.history
+
+    if checkpointer is not None:
+        checkpointer.save(Q, metrics, rng)
+
+    return Q, metrics
+
+
+def sarsa_batched(env, n_envs=1024, duplicates="add", seed=None,
+                  config=None, metrics=None, log_every=None,
+                  monitor=None, checkpointer=None, resume_from=None,
+                  profiler=None, evaluator=None):
+    """
+    SARSA over n_envs episodes running in lockstep.
+
+    Every env step produces n_envs transitions, which are applied
+    in one vectorized TD update (see QTable.td_update for the
+    meaning of duplicates = "add" / "last").
+
+    Training stops once config.num_episodes episodes have finished, or
+    earlier if the optional ConvergenceMonitor reports convergence.
+    """
+
+    # Experiment settings (default: the ones the env was built with)
+    if config is None:
+        config = env.config
+
+    num_episodes = config.num_episodes
+    max_steps = config.max_steps_per_episode
+    alpha, discount, epsilon = config.alpha, config.discount, config.epsilon
+
+    Q = new_qtable(env, config)
+    batch_env = BatchFrozenLakeEnv(n_envs, env, max_steps)
+    rng = np.random.default_rng(seed)
+
+    # Per-episode reward / steps / success history
+    if metrics is None:
+        metrics = MetricsRecorder(num_episodes, max_steps=max_steps)
+
+    # Continue from a saved checkpoint
+    # (episodes that were in flight when it was saved are restarted)
+    if resume_from is not None:
+        Q, _ = load_checkpoint(resume_from, metrics, rng, Q)
+
+    states = batch_env.reset()
+
+    # Select first actions BEFORE loop
+    actions = epsilon_greedy_batch(Q, states, epsilon, rng)
+
+    total_reward = np.zeros(n_envs, dtype=np.int64)
+
+    # Swapped for timed versions on profiled batch steps
+    select, step, td_update = epsilon_greedy_batch, batch_env.step, Q.td_update
+
+    while metrics.count < num_episodes:
+
+        if profiler is not None:
+            select, step, td_update = profiler.start(
+                ("action_selection", epsilon_greedy_batch),
+                ("env_step", batch_env.step),
+                ("q_update", Q.td_update),
+            )
+
+        # Take actions
+        next_states, rewards, dones, truncated = step(actions)
+        total_reward += rewards
+
+        # Choose next actions (on-policy)
+        next_actions = select(Q, next_states, epsilon, rng)
+
+        # SARSA TD update, no bootstrap from terminal states
+        next_q = Q.gather(next_states, next_actions) * ~dones
+        td_update(
+            states, actions,
+            rewards + discount * next_q,
+            alpha, duplicates
+        )
+
+        if profiler is not None:
+            profiler.mark("q_update")
+
+        ended = np.flatnonzero(dones | truncated)
+
+        if ended.size:
+            # Finished slots restart from the start state,
+            # so they need a fresh first action
+            next_actions[ended] = select(
+                Q, batch_env.states[ended], epsilon, rng
+            )
+
+            previous_count = metrics.count
+            recorded = ended[:num_episodes - metrics.count]
+            metrics.record_batch(
+                total_reward[recorded],
+                batch_env.episode_lengths[recorded],
+                rewards[recorded] == 1
+            )
+            total_reward[ended] = 0
+
+            if log_every:
+                log_progress("SARSA", metrics, log_every, previous_count)
+
+            # Early stopping once the monitor reports convergence
+            if monitor is not None and monitor.update(Q, metrics.count):
+                break
+
+            if checkpointer is not None:
+                checkpointer.update(Q, metrics, rng)
+
+            # Greedy-policy evaluation every K episodes
+            if evaluator is not None:
+                evaluator.update(Q, metrics.count)
+
+        # Move forward
+        states = batch_env.states
+        actions = next_actions
+
+        if profiler is not None:
+            profiler.mark("bookkeeping")
+
+    if monitor is not None:
+        metrics.meta["converged_episode"] = monitor.converged_at
+
+    if profiler is not None:
+        metrics.meta["profile"] = profiler.report()
+
+    if evaluator is not None:
+        metrics.meta["evaluation"] = evaluator.history
+
+    if checkpointer is not None:
+        checkpointer.save(Q, metrics, rng)
 
-    return Q, metrics
\ No newline at end of file
+    return Q, metrics
@@ -0,0 +1,144 @@
+"""
+stats.py
+
+Streaming training statistics, updated in O(1) per episode.
+
+RunningStats keeps:
+- windowed mean reward and mean steps (last `window` episodes)
+- windowed success rate
+- cumulative accuracy (successes / episodes so far)
+
+Only the last `window` episodes are held in memory, so runs of
+millions of episodes can be monitored live while training.
+"""
+
+
+class RunningStats:
+    """
+    Ring buffer of the last `window` episodes with running sums.
+    """
+
+    def __init__(self, window=500):
+        """
+        Inputs:
+            window → number of recent episodes in the moving averages
+                     (500 matches misc.moving_average)
+        """
+
+        self.window = window
+
+        # Ring buffers (plain lists: fastest for scalar access)
+        self._rewards = [0] * window
+        self._steps = [0] * window
+        self._success = [0] * window
+        self._pos = 0
+        self._filled = 0
+
+        # Running sums over the window (integers, so no drift)
+        self._reward_sum = 0
+        self._steps_sum = 0
+        self._success_sum = 0
+
+        # Cumulative counters over the whole run
+        self.episodes = 0
+        self.successes = 0
+
+    def update(self, reward, steps, success):
+        """
+        Add one finished episode.
+        """
+
+        i = self._pos
+
+        self._reward_sum += reward - self._rewards[i]
+        self._steps_sum += steps - self._steps[i]
+        self._success_sum += success - self._success[i]
+
+        self._rewards[i] = reward
+        self._steps[i] = steps
+        self._success[i] = success
+
+        self._pos = i + 1 if i + 1 < self.window else 0
+        if self._filled < self.window:
+            self._filled += 1
+
+        self.episodes += 1
+        self.successes += success
+
+    def state(self):
+        """
+        Plain-Python copy of the internal state (for checkpoints).
+        """
+        return {k: list(v) if isinstance(v, list) else v
+                for k, v in self.__dict__.items()}
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        Rebuild a RunningStats saved with state().
+        """
+        stats = cls(state["window"])
+        stats.__dict__.update(state)
+        return stats
+
+    def update_batch(self, rewards, steps, success):
+        """
+        Add several finished episodes (array inputs).
+        """
+
+        for r, s, c in zip(rewards.tolist(), steps.tolist(), success.tolist()):
+            self.update(int(r), int(s), int(c))
+
+    # --------------------------------------------------
+    # Current values
+    # --------------------------------------------------
+
+    @property
+    def mean_reward(self):
+        return self._reward_sum / self._filled if self._filled else 0.0
+
+    @property
+    def mean_steps(self):
+        return self._steps_sum / self._filled if self._filled else 0.0
+
+    @property
+    def success_rate(self):
+        return self._success_sum / self._filled if self._filled else 0.0
+
+    @property
+    def accuracy(self):
+        return self.successes / self.episodes if self.episodes else 0.0
+
+    def snapshot(self):
+        """
+        Current statistics as a dictionary.
+        """
+        return {
+            "episode": self.episodes,
+            "mean_reward": self.mean_reward,
+            "mean_steps": self.mean_steps,
+            "success_rate": self.success_rate,
+            "accuracy": self.accuracy,
+        }
+
+    def __str__(self):
+        return (
+            f"episode {self.episodes} | "
+            f"reward {self.mean_reward:.3f} | "
+            f"steps {self.mean_steps:.1f} | "
+            f"success {self.success_rate:.3f} | "
+            f"accuracy {self.accuracy:.3f}"
+        )
+
+
+def log_progress(name, metrics, log_every, previous_count):
+    """
+    Print the running statistics of a MetricsRecorder whenever
+    a multiple of log_every episodes was passed since previous_count.
+    """
+
+    if metrics.count // log_every > previous_count // log_every:
+        if metrics.stats is None:
+            print(f"[{name}] episode {metrics.count}")
+        else:
+            print(f"[{name}] {metrics.stats}")
@@ -0,0 +1,486 @@
+"""
+sweep.py
+
+Hyperparameter sweeps over ExperimentConfig fields.
+
+A sweep space maps config field names to lists of candidate values:
+
+    space = {
+        "alpha": [0.01, 0.05, 0.1],
+        "epsilon": [0.01, 0.1],
+        "num_episodes": [20000],
+    }
+
+Several fields that must change together (e.g. a whole map) go under
+any other key as a list of dictionaries:
+
+    space["map"] = [
+        {},                                        # default map
+        {"grid_rows": 4, "grid_cols": 4, "goal_state": (3, 3),
+         "holes": ((1, 1), (1, 3), (2, 3), (3, 0))},
+    ]
+
+grid_configs builds every combination, random_configs samples some.
+run_sweep trains every (config, algorithm, seed) job on a process pool.
+
+With cache_dir set, each finished job is stored as one .npz file
+named after the config hash, algorithm and seed. Repeating or
+extending a sweep loads those instead of training again.
+(Delete the cache directory after changing a learner.)
+
+Fields an algorithm never reads (runner.IGNORED_FIELDS, e.g. alpha
+for Monte Carlo, which uses mc_alpha) do not multiply its jobs.
+
+Command line:
+
+    python sweep.py --alpha 0.01 0.05 0.1 --mc-alpha 0.01 0.05
+                    --epsilon 0.01 0.1
+                    --episodes 20000 --seeds 0 1 2 --cache-dir sweep_cache
+
+    python sweep.py --size 10 25 --hole-density 0.1 0.2 --map-seed 0 1
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, fields
+
+import numpy as np
+
+from config import DEFAULT_CONFIG, ExperimentConfig
+from metrics import FIELDS, MetricsRecorder
+from qtable import empty_qtable, qtable_arrays, fill_qtable
+from runner import (ALGORITHMS, DEFAULT_ALGORITHMS, IGNORED_FIELDS,
+                    job_seed, _train_job)
+
+# Names of the ExperimentConfig fields
+CONFIG_FIELDS = tuple(f.name for f in fields(ExperimentConfig))
+
+
+# ============================================================
+# 1. Building Configurations
+# ============================================================
+
+def _apply(base, key, value):
+    """
+    Set one sweep dimension on a config.
+
+    A dictionary value changes several fields at once.
+    """
+
+    if isinstance(value, dict):
+        return base.replace(**value)
+
+    if key not in CONFIG_FIELDS:
+        raise ValueError(f"unknown config field {key!r}")
+
+    return base.replace(**{key: value})
+
+
+def grid_configs(space, base=None):
+    """
+    Every combination of the values in `space` (grid search).
+
+    Inputs:
+        space → {field or group name: list of values}
+        base  → config the values are applied to
+                (default: config.DEFAULT_CONFIG)
+
+    Returns:
+        list of ExperimentConfig
+    """
+
+    if base is None:
+        base = DEFAULT_CONFIG
+
+    keys = list(space)
+    configs = []
+
+    for values in itertools.product(*(space[k] for k in keys)):
+        config = base
+        for key, value in zip(keys, values):
+            config = _apply(config, key, value)
+        configs.append(config)
+
+    return configs
+
+
+def job_config(config, name):
+    """
+    The config one algorithm actually trains with: fields it never
+    reads (runner.IGNORED_FIELDS) reset to their DEFAULT_CONFIG values,
+    so configs differing only there share one job and cache entry.
+    """
+
+    ignored = IGNORED_FIELDS.get(name, ())
+    return config.replace(
+        **{f: getattr(DEFAULT_CONFIG, f) for f in ignored}
+    )
+
+
+def random_configs(space, n, seed=0, base=None):
+    """
+    n configurations, each dimension drawn uniformly from its values
+    (random search). Duplicates are dropped.
+    """
+
+    if base is None:
+        base = DEFAULT_CONFIG
+
+    rng = random.Random(seed)
+    configs = {}
+
+    for _ in range(n):
+        config = base
+        for key, values in space.items():
+            config = _apply(config, key, rng.choice(values))
+        configs.setdefault(config_hash(config), config)
+
+    return list(configs.values())
+
+
+def config_hash(config):
+    """
+    Stable short hash of every field of a config.
+
+    Tuples and lists hash the same, so a config rebuilt from
+    JSON gets the same hash.
+    """
+
+    text = json.dumps(asdict(config), sort_keys=True)
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+
+# ============================================================
+# 2. On-Disk Cache
+# ============================================================
+
+class SweepCache:
+    """
+    Directory with one .npz file per finished job.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path(self, key):
+        """
+        File for a job key (config hash, algorithm, seed, base seed).
+        """
+
+        digest, name, seed, base_seed = key
+        slug = name.lower().replace(" ", "_").replace("-", "_")
+        return os.path.join(
+            self.cache_dir, f"{digest}_{slug}_s{seed}_b{base_seed}.npz"
+        )
+
+    def get(self, key, config):
+        """
+        Cached result dictionary, or None if the job never finished.
+
+        The Q-table is rebuilt with the config's storage.
+        """
+
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+
+        with np.load(path) as data:
+            header = json.loads(str(data["header"]))
+            Q = empty_qtable(config.grid_rows * config.grid_cols, config)
+            fill_qtable(Q, data)
+            arrays = [data[name].copy() for name in FIELDS]
+
+        metrics = MetricsRecorder.from_arrays(
+            *arrays, meta=header["meta"], count=header.get("count"),
+            keep_history=header.get("keep_history", True)
+        )
+
+        return {"Q": Q, "metrics": metrics, "time": header["time"]}
+
+    def put(self, key, config, result):
+        """
+        Store one finished job (atomically: temp file + rename).
+        """
+
+        metrics = result["metrics"]
+        header = {
+            "config": asdict(config),
+            "time": result["time"],
+            "meta": metrics.meta,
+            "count": metrics.count,
+            "keep_history": metrics.keep_history,
+        }
+
+        path = self.path(key)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(
+                f,
+                **qtable_arrays(result["Q"]),
+                header=np.array(json.dumps(header, default=str)),
+                **{name: np.asarray(metrics[name]) for name in FIELDS}
+            )
+        os.replace(tmp_path, path)
+
+
+# ============================================================
+# 3. Running a Sweep
+# ============================================================
+
+def run_sweep(configs, algorithms=None, seeds=(0,), processes=None,
+              base_seed=0, cache_dir=None):
+    """
+    Train every algorithm with every seed on every config.
+
+    Inputs:
+        configs    → list of ExperimentConfig
+        algorithms → names from runner.ALGORITHMS
+                     (default: runner.DEFAULT_ALGORITHMS)
+        seeds      → iterable of run seeds
+        processes  → pool size (None = CPU count, 1 = run in-process)
+        base_seed  → root of all derived random streams
+                     (a seed uses the same stream under every config)
+        cache_dir  → directory of cached results (None = no cache)
+
+    Returns:
+        list of dictionaries, one per distinct job, in input order
+        (a job's config is job_config(config, algorithm), so e.g.
+        Monte Carlo runs once per seed however many alphas are swept):
+            config, hash, algorithm, seed,
+            Q, metrics, time, cached (True if loaded from the cache)
+    """
+
+    if algorithms is None:
+        algorithms = list(DEFAULT_ALGORITHMS)
+
+    cache = SweepCache(cache_dir) if cache_dir is not None else None
+    names = list(ALGORITHMS)
+
+    # --------------------------------------------------
+    # Collect the jobs, loading finished ones from the cache
+    # --------------------------------------------------
+    records = []
+    pending = []
+    seen = set()
+
+    for base_config in configs:
+        for name in algorithms:
+            config = job_config(base_config, name)
+            digest = config_hash(config)
+            for seed in seeds:
+                key = (digest, name, seed, base_seed)
+                if key in seen:
+                    continue
+                seen.add(key)
+
+                record = {
+                    "config": config, "hash": digest,
+                    "algorithm": name, "seed": seed,
+                }
+
+                cached = cache.get(key, config) if cache is not None else None
+                if cached is not None:
+                    record.update(cached, cached=True)
+                else:
+                    job = (name, seed, job_seed(base_seed, names.index(name), seed), config)
+                    pending.append((key, job, record))
+
+                records.append(record)
+
+    # Longest jobs first, so the pool is not left waiting on one
+    # big job at the end
+    pending.sort(key=lambda p: -_job_cost(p[1][3]))
+
+    # --------------------------------------------------
+    # Train the rest, caching each job as soon as it finishes
+    # --------------------------------------------------
+    def finish(key, record, output):
+        _, _, Q, metrics, elapsed = output
+        result = {
+            "Q": Q,
+            "metrics": metrics,
+            "time": elapsed,
+        }
+        if cache is not None:
+            cache.put(key, record["config"], result)
+        record.update(result, cached=False)
+
+    if processes == 1 or len(pending) <= 1:
+        for key, job, record in pending:
+            finish(key, record, _train_job(job))
+        return records
+
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = {
+            pool.submit(_train_job, job): (key, record)
+            for key, job, record in pending
+        }
+        for future in as_completed(futures):
+            finish(*futures[future], future.result())
+
+    return records
+
+
+def _job_cost(config):
+    """
+    Rough relative cost of one job (for scheduling only).
+    """
+    return config.num_episodes * config.grid_rows * config.grid_cols
+
+
+# ============================================================
+# 4. Summaries
+# ============================================================
+
+def summarize(records, last=500):
+    """
+    One row per (config, algorithm), averaged over seeds.
+
+    Returns list of dictionaries, best final success rate first:
+        hash, algorithm, the swept config fields ("-" where the
+        algorithm ignores the field), seeds,
+        success    → mean success rate over the last `last` episodes
+        reward     → mean reward over the last `last` episodes
+        time       → mean training time (s)
+    """
+
+    groups = {}
+    for r in records:
+        groups.setdefault((r["hash"], r["algorithm"]), []).append(r)
+
+    # Only report fields that actually vary across the sweep
+    configs = [r["config"] for r in records]
+    varying = [
+        f for f in CONFIG_FIELDS
+        if len({json.dumps(getattr(c, f)) for c in configs}) > 1
+    ]
+
+    rows = []
+    for (digest, name), group in groups.items():
+        row = {"hash": digest, "algorithm": name}
+        ignored = IGNORED_FIELDS.get(name, ())
+        row.update({
+            f: "-" if f in ignored else getattr(group[0]["config"], f)
+            for f in varying
+        })
+        row["seeds"] = len(group)
+        row["success"] = float(np.mean(
+            [np.mean(r["metrics"]["success"][-last:]) for r in group]
+        ))
+        row["reward"] = float(np.mean(
+            [np.mean(r["metrics"]["rewards"][-last:]) for r in group]
+        ))
+        row["time"] = float(np.mean([r["time"] for r in group]))
+        rows.append(row)
+
+    rows.sort(key=lambda row: -row["success"])
+    return rows
+
+
+def print_summary(rows):
+    """
+    Print summarize() output as a plain-text table.
+    """
+
+    if not rows:
+        return
+
+    columns = [c for c in rows[0] if c != "hash"]
+    cells = [[_format(row[c]) for c in columns] for row in rows]
+    widths = [
+        max(len(c), *(len(line[i]) for line in cells))
+        for i, c in enumerate(columns)
+    ]
+
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for line in cells:
+        print("  ".join(v.ljust(w) for v, w in zip(line, widths)))
+
+
+def _format(value):
+    if isinstance(value, float):
+        return f"{value:.4g}"
+    if isinstance(value, tuple) and len(value) > 4:
+        return f"({len(value)} items)"
+    return str(value)
+
+
+# ============================================================
+# 5. Command Line
+# ============================================================
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(
+        description="Grid or random search over ExperimentConfig values."
+    )
+    parser.add_argument("--algorithms", nargs="+", choices=list(ALGORITHMS),
+                        default=list(DEFAULT_ALGORITHMS))
+    parser.add_argument("--alpha", nargs="+", type=float,
+                        help="TD learning rate (SARSA, Q-Learning, Dyna-Q)")
+    parser.add_argument("--mc-alpha", nargs="+", type=float,
+                        help="Monte Carlo learning rate")
+    parser.add_argument("--discount", nargs="+", type=float)
+    parser.add_argument("--epsilon", nargs="+", type=float)
+    parser.add_argument("--episodes", nargs="+", type=int)
+    parser.add_argument("--size", nargs="+", type=int,
+                        help="square map sizes (needs --hole-density)")
+    parser.add_argument("--hole-density", nargs="+", type=float,
+                        help="generate maps with these hole densities")
+    parser.add_argument("--map-seed", nargs="+", type=int,
+                        help="seeds of the generated maps")
+    parser.add_argument("--seeds", nargs="+", type=int, default=[0])
+    parser.add_argument("--random", type=int, default=None, metavar="N",
+                        help="sample N configs instead of the full grid")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--cache-dir", default=None)
+    args = parser.parse_args(argv)
+
+    # The default map's fixed holes only fit the default grid size
+    if args.size and not args.hole_density:
+        parser.error("--size needs --hole-density")
+
+    space = {
+        field: values
+        for field, values in (
+            ("alpha", args.alpha),
+            ("mc_alpha", args.mc_alpha),
+            ("discount", args.discount),
+            ("epsilon", args.epsilon),
+            ("num_episodes", args.episodes),
+            ("hole_density", args.hole_density),
+            ("map_seed", args.map_seed),
+        )
+        if values
+    }
+
+    # Grid size, with the goal in the bottom-right corner
+    if args.size:
+        space["size"] = [
+            {"grid_rows": n, "grid_cols": n, "goal_state": (n - 1, n - 1)}
+            for n in args.size
+        ]
+
+    if args.random is None:
+        configs = grid_configs(space)
+    else:
+        configs = random_configs(space, args.random)
+
+    records = run_sweep(
+        configs, args.algorithms, seeds=args.seeds,
+        processes=args.processes, cache_dir=args.cache_dir
+    )
+
+    cached = sum(r["cached"] for r in records)
+    print(f"{len(records)} jobs ({cached} from cache)\n")
+    print_summary(summarize(records))
+
+
+if __name__ == "__main__":
+    main()